@@ -1,10 +1,12 @@
 import streamlit as st
 st.set_page_config(layout="wide")
 
-import sqlite3
 import pandas as pd
 from streamlit_oauth import OAuth2Component
 import jwt
+from sqlalchemy import text
+from banco import atualizar_situacoes, incrementar_versao_dados
+from conexao import criar_engine
 
 # =====================================================
 # CONFIG OAUTH GOOGLE
@@ -37,58 +39,57 @@ oauth2 = OAuth2Component(
 # BANCO
 # ---------------------------
 
-def conectar():
-    return sqlite3.connect("banco.db", check_same_thread=False)
+# conexões persistentes, compartilhadas por todas as sessões (ver conexao.py),
+# em vez de abrir e fechar uma conexão sqlite3 a cada consulta
+@st.cache_resource
+def get_engine():
+    return criar_engine("sqlite:///banco.db")
 
 
 def buscar_responsavel_por_email(email):
-    conn = conectar()
-    cursor = conn.cursor()
+    with get_engine().connect() as conn:
+        resultado = conn.execute(text("""
+            SELECT usuario
+            FROM responsaveis
+            WHERE LOWER(TRIM(email)) = LOWER(TRIM(:email))
+        """), {"email": email.strip()}).fetchone()
 
-    cursor.execute("""
-        SELECT usuario
-        FROM responsaveis
-        WHERE LOWER(TRIM(email)) = LOWER(TRIM(?))
-    """, (email.strip(),))
-
-    resultado = cursor.fetchone()
-    conn.close()
     return resultado
 
 
 def carregar_metas(usuario):
-    conn = conectar()
-
-    query = """
+    query = text("""
     SELECT rowid as ID,
            Meta,
            `Descrição da Meta` as Descricao,
            execucao as Status,
            Ano_Conclusao as Ano
     FROM metas
-    WHERE Resp_1 = ?
-    """
+    WHERE Resp_1 = :usuario
+    """)
 
-    df = pd.read_sql(query, conn, params=(usuario,))
-    conn.close()
+    with get_engine().connect() as conn:
+        df = pd.read_sql(query, conn, params={"usuario": usuario})
 
-    df["Status"] = df["Status"].fillna("NÃO INICIADA")
+    # a planilha deixa a situação vazia ("") nas metas não preenchidas:
+    # vazio e nulo são "NÃO INICIADA", como no resumo_metas
+    vazio = df["Status"].isna() | (df["Status"].astype(str).str.strip() == "")
+    df["Status"] = df["Status"].mask(vazio, "NÃO INICIADA")
     df["Ano"] = df["Ano"].fillna("")
     return df
 
 
-def atualizar_status(id_meta, status, ano):
-    conn = conectar()
-    cursor = conn.cursor()
+def salvar_alteracoes(alteracoes):
 
-    cursor.execute("""
-        UPDATE metas
-        SET execucao=?, Ano_Conclusao=?
-        WHERE rowid=?
-    """, (status, ano, id_meta))
+    # mesma gravação de app.py (só as metas alteradas, numa única
+    # transação), com a meta identificada pelo rowid; devolve quantas
+    with get_engine().begin() as conn:
+        alteradas = atualizar_situacoes(conn, alteracoes, chave="rowid")
+        # avisa os painéis que os dados mudaram (ver banco.ler_versao_dados)
+        if alteradas:
+            incrementar_versao_dados(conn)
 
-    conn.commit()
-    conn.close()
+    return alteradas
 
 
 # ---------------------------
@@ -161,6 +162,10 @@ if st.button("Sair"):
     st.session_state.clear()
     st.rerun()
 
+# resultado do último "Salvar alterações" (a página é recarregada depois)
+if "mensagem_salvar" in st.session_state:
+    st.success(st.session_state.pop("mensagem_salvar"))
+
 df = carregar_metas(st.session_state.usuario)
 
 if df.empty:
@@ -231,10 +236,13 @@ if not metas_editaveis.empty:
         c1.write(row["Meta"])
         c2.write(row["Descricao"])
 
+        # situação fora da lista aparece como a primeira opção
+        status_exibido = row["Status"] if row["Status"] in status_opcoes else status_opcoes[0]
+
         novo_status = c3.selectbox(
             "",
             status_opcoes,
-            index=status_opcoes.index(row["Status"]) if row["Status"] in status_opcoes else 0,
+            index=status_opcoes.index(status_exibido),
             key=f"status_{row['ID']}",
             label_visibility="collapsed"
         )
@@ -251,7 +259,10 @@ if not metas_editaveis.empty:
         else:
             c4.write("-")
 
-        alteracoes.append((row["ID"], novo_status, ano_escolhido))
+        # só entra o que o responsável mudou em relação ao que a tela
+        # mostrou (o ano só aparece para quem passa a CONCLUÍDA)
+        if novo_status != status_exibido:
+            alteracoes.append((row["ID"], novo_status, ano_escolhido))
 
 else:
     st.info("Não há metas em andamento.")
@@ -263,11 +274,14 @@ if st.button("Salvar alterações"):
             st.warning("Informe o ano para todas as metas concluídas.")
             st.stop()
 
-    for id_meta, status, ano in alteracoes:
-        atualizar_status(id_meta, status, ano)
-
-    st.success("Alterações salvas com sucesso!")
-    st.rerun()
+    if not alteracoes:
+        st.info("Nenhuma alteração para salvar.")
+    else:
+        alteradas = salvar_alteracoes(alteracoes)
+        st.session_state.mensagem_salvar = (
+            f"Alterações salvas com sucesso! {alteradas} meta(s) atualizada(s)."
+        )
+        st.rerun()
 
 if not metas_concluidas.empty:
     st.subheader("Metas concluídas")
@@ -0,0 +1,528 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import bindparam, inspect, text
+
+from classificacao import (
+    anos_seguros,
+    classificar_execucao2,
+    classificar_execucao2_vetorizado,
+    inteiro_seguro,
+    sql_execucao2
+)
+
+# =====================================================
+# TABELA DE CONTROLE
+# =====================================================
+
+def garantir_tabela_controle(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS controle (
+            chave VARCHAR(50) PRIMARY KEY,
+            valor INTEGER
+        )
+    """))
+
+
+def ler_controle(conn, chave):
+    resultado = conn.execute(
+        text("SELECT valor FROM controle WHERE chave = :chave"),
+        {"chave": chave}
+    ).fetchone()
+
+    return resultado[0] if resultado else None
+
+
+def gravar_controle(conn, chave, valor):
+    conn.execute(
+        text("""
+            INSERT INTO controle (chave, valor)
+            VALUES (:chave, :valor)
+            ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor
+        """),
+        {"chave": chave, "valor": valor}
+    )
+
+# =====================================================
+# VERSÃO DOS DADOS
+# =====================================================
+
+def ler_versao_dados(engine):
+
+    # consulta de uma linha: é o que cada rerun dos painéis paga
+    # para saber se o cache de metas ainda vale
+    # (a tabela controle é criada por recalcular_execucao2_virada_de_ano)
+    with engine.connect() as conn:
+        versao = ler_controle(conn, "versao_dados")
+
+    return versao or 0
+
+
+def incrementar_versao_dados(conn):
+    garantir_tabela_controle(conn)
+    conn.execute(text("""
+        INSERT INTO controle (chave, valor)
+        VALUES ('versao_dados', 1)
+        ON CONFLICT (chave) DO UPDATE SET valor = controle.valor + 1
+    """))
+
+# =====================================================
+# EXECUCAO2 NA ESCRITA
+# =====================================================
+
+def atualizar_situacoes(conn, alteracoes, chave='"Ordem"'):
+
+    # alteracoes = [(id_meta, status, ano)], só as metas que mudaram;
+    # chave: coluna que identifica a meta ("Ordem" em app.py, rowid em app2.py).
+    # Devolve quantas metas foram atualizadas.
+    if not alteracoes:
+        return 0
+
+    # 1️⃣ Início e fim de todas as metas alteradas numa consulta só
+    prazos = {
+        id_meta: (inicio, fim)
+        for id_meta, inicio, fim in conn.execute(
+            text(f'SELECT {chave}, "Inicio", "Fim" FROM metas WHERE {chave} IN :ids')
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": [id_meta for id_meta, _, _ in alteracoes]}
+        )
+    }
+
+    # 2️⃣ execucao2 de cada meta com os valores novos; o ano vem da tela
+    # como texto ("" sem ano) e a coluna é inteira (no Postgres, BIGINT)
+    registros = [
+        {
+            "status": status,
+            "ano": inteiro_seguro(ano),
+            "execucao2": classificar_execucao2({
+                "execucao": status,
+                "Inicio": prazos[id_meta][0],
+                "Fim": prazos[id_meta][1],
+                "Ano_Conclusao": ano
+            }),
+            "id_meta": id_meta
+        }
+        for id_meta, status, ano in alteracoes
+        if id_meta in prazos
+    ]
+
+    if not registros:
+        return 0
+
+    # 3️⃣ Um único executemany, na transação de quem chamou
+    conn.execute(
+        text(f"""
+            UPDATE metas
+            SET "execucao" = :status,
+                "Ano_Conclusao" = :ano,
+                "execucao2" = :execucao2
+            WHERE {chave} = :id_meta
+        """),
+        registros
+    )
+
+    return len(registros)
+
+# =====================================================
+# RECÁLCULO COMPLETO (VIRADA DE ANO)
+# =====================================================
+
+def garantir_coluna_execucao2(conn):
+    colunas = [c["name"] for c in inspect(conn).get_columns("metas")]
+
+    if "execucao2" in colunas:
+        return False
+
+    conn.execute(text("ALTER TABLE metas ADD COLUMN execucao2 TEXT"))
+    return True
+
+
+def recalcular_execucao2(conn):
+
+    # 1️⃣ Carrega só as colunas usadas na classificação
+    df_temp = pd.read_sql(
+        text('SELECT "Ordem", execucao, "Inicio", "Fim", "Ano_Conclusao", execucao2 FROM metas'),
+        conn
+    )
+
+    # 2️⃣ Recalcula a coluna (vetorizado)
+    novo_execucao2 = classificar_execucao2_vetorizado(df_temp).astype(object)
+
+    # 3️⃣ Mantém apenas as metas cuja classificação mudou
+    mudou = novo_execucao2 != df_temp["execucao2"]
+
+    alteracoes = [
+        {"execucao2": execucao2, "ordem": ordem}
+        for ordem, execucao2 in zip(
+            df_temp.loc[mudou, "Ordem"].tolist(),
+            novo_execucao2[mudou].tolist()
+        )
+    ]
+
+    if not alteracoes:
+        return 0
+
+    # 4️⃣ Atualiza no banco com um único executemany
+    conn.execute(
+        text("""
+            UPDATE metas
+            SET execucao2 = :execucao2
+            WHERE "Ordem" = :ordem
+        """),
+        alteracoes
+    )
+
+    return len(alteracoes)
+
+
+_ano_verificado = None
+
+def recalcular_execucao2_virada_de_ano(engine):
+
+    # execucao2 depende do ano corrente: fora a virada do ano,
+    # só muda quando uma meta é salva (ver atualizar_situacoes)
+    global _ano_verificado
+
+    ano = datetime.now().year
+
+    if _ano_verificado == ano:
+        return 0
+
+    with engine.begin() as conn:
+        garantir_tabela_controle(conn)
+
+        # a coluna some quando a tabela é recriada (importar_metas.py
+        # --substituir), mesmo com o ano já registrado em controle
+        criada = garantir_coluna_execucao2(conn)
+
+        alteradas = 0
+        if criada or ler_controle(conn, "execucao2_ano") != ano:
+            alteradas = recalcular_execucao2(conn)
+            # o resumo_metas também depende do ano (execucao2)
+            if not garantir_resumo_metas(conn):
+                reconstruir_resumo_metas(conn)
+            gravar_controle(conn, "execucao2_ano", ano)
+            # a view metas_temporal também muda com o ano
+            incrementar_versao_dados(conn)
+
+    _ano_verificado = ano
+    return alteradas
+
+# =====================================================
+# VIEW metas_temporal (execucao2 calculada no banco)
+# =====================================================
+
+_view_verificada = False
+
+def garantir_view_metas_temporal(engine):
+
+    # a view recalcula execucao2 com o ano corrente a cada consulta,
+    # então a leitura não depende do valor gravado na tabela
+    global _view_verificada
+
+    if _view_verificada:
+        return
+
+    with engine.begin() as conn:
+        if "metas_temporal" not in inspect(conn).get_view_names():
+            criar_view_metas_temporal(conn)
+
+    _view_verificada = True
+
+
+def criar_view_metas_temporal(conn):
+
+    # também usada por importar_metas.py --substituir no Postgres, que
+    # precisa apagar a view para recriar a tabela metas
+    colunas = [
+        f'"{c["name"]}"'
+        for c in inspect(conn).get_columns("metas")
+        if c["name"] != "execucao2"
+    ]
+
+    conn.execute(text(f"""
+        CREATE VIEW metas_temporal AS
+        SELECT {", ".join(colunas)},
+               {sql_execucao2(conn.dialect.name)} AS execucao2
+        FROM metas
+    """))
+
+# =====================================================
+# LEITURA DAS METAS (SÓ AS COLUNAS USADAS, JÁ TIPADAS)
+# =====================================================
+
+# expressão SQL das colunas que já vêm normalizadas do banco
+# (situação vazia ou nula conta como "NÃO INICIADA", como nos painéis)
+_SQL_COLUNAS = {
+    "execucao": "COALESCE(NULLIF(execucao, ''), 'NÃO INICIADA')"
+}
+
+COLUNAS_ANO = ["Inicio", "Fim", "Ano_Conclusao"]
+
+COLUNAS_CATEGORIA = [
+    "Eixo",
+    "Objetivo Estratégico",
+    "Objetivo Específico",
+    "Resp_1",
+    "execucao",
+    "execucao2"
+]
+
+
+def _coluna_ano(valores):
+    # mesma leitura de inteiro_seguro; fora da faixa do Int16 vira nulo
+    anos = anos_seguros(valores)
+    anos[np.abs(anos) > np.iinfo(np.int16).max] = np.nan
+    return pd.array(anos, dtype="Int16")
+
+
+def carregar_metas(engine, colunas, tabela="metas_temporal"):
+
+    # 1️⃣ Projeção no SQL: só as colunas que a página usa
+    selecao = ", ".join(
+        _SQL_COLUNAS.get(c, f'"{c}"') + f' AS "{c}"' for c in colunas
+    )
+
+    with engine.connect() as conn:
+        df = pd.read_sql(text(f"SELECT {selecao} FROM {tabela}"), conn)
+
+    # 2️⃣ Tipos explícitos, em vez de object para tudo
+    for coluna in df.columns:
+        if coluna in COLUNAS_ANO:
+            df[coluna] = _coluna_ano(df[coluna])
+        elif coluna in COLUNAS_CATEGORIA:
+            df[coluna] = df[coluna].astype("category")
+
+    return df
+
+# =====================================================
+# RESUMO DAS METAS (MANTIDO PELO PRÓPRIO BANCO)
+# =====================================================
+# resumo_metas guarda a quantidade de metas por combinação de
+# (Resp_1, Eixo, Objetivo Estratégico, Objetivo Específico, execucao,
+# execucao2): algumas centenas de linhas, não importa quantas metas haja.
+# Gatilhos na tabela metas mantêm as contagens a cada INSERT, DELETE ou
+# UPDATE, venha a gravação de onde vier (app.py, app2.py, recálculos).
+#
+# - execucao sai normalizada ("NÃO INICIADA" para vazio ou nulo) e
+#   execucao2 é a mesma expressão da view metas_temporal;
+# - a chave única não aceita nulos: valor nulo é gravado como '' e volta
+#   como nulo na leitura (carregar_resumo_metas);
+# - execucao2 depende do ano corrente: na virada do ano o resumo é
+#   reconstruído (ver recalcular_execucao2_virada_de_ano);
+# - importar_metas.py --substituir recria a tabela metas, o que apaga os
+#   gatilhos: garantir_resumo_metas recria tudo e reconstrói o resumo;
+# - cargas grandes (importar_metas.importar_em_lote) desligam os gatilhos
+#   e reconstroem o resumo no fim: um gatilho por linha atualiza as mesmas
+#   poucas linhas do resumo milhares de vezes na mesma transação, e no
+#   Postgres cada atualização fica mais lenta que a anterior (as versões
+#   antigas da linha só são descartadas depois do commit).
+
+COLUNAS_RESUMO = [
+    "Resp_1",
+    "Eixo",
+    "Objetivo Estratégico",
+    "Objetivo Específico",
+    "execucao",
+    "execucao2"
+]
+
+# colunas de metas que decidem em que linha do resumo a meta cai
+_COLUNAS_GATILHO = [
+    "Resp_1",
+    "Eixo",
+    "Objetivo Estratégico",
+    "Objetivo Específico",
+    "execucao",
+    "Inicio",
+    "Fim",
+    "Ano_Conclusao"
+]
+
+_GATILHOS_SQLITE = ["resumo_metas_inserir", "resumo_metas_excluir", "resumo_metas_alterar"]
+
+
+def _sql_colunas_resumo():
+    return ", ".join(f'"{c}"' for c in COLUNAS_RESUMO)
+
+
+def _sql_chave_resumo(dialeto):
+
+    # expressões da chave do resumo sobre uma linha de metas
+    expressoes = [
+        f"COALESCE(CAST(\"{c}\" AS TEXT), '')"
+        for c in COLUNAS_RESUMO
+        if c not in ("execucao", "execucao2")
+    ]
+    expressoes.append(_SQL_COLUNAS["execucao"])
+    expressoes.append(sql_execucao2(dialeto))
+
+    return ", ".join(expressoes)
+
+
+def _sql_linha_gatilho(registro):
+    # a linha NEW/OLD como uma tabela de uma linha, com os nomes de metas
+    colunas = ", ".join(f'{registro}."{c}" AS "{c}"' for c in _COLUNAS_GATILHO)
+    return f"(SELECT {colunas}) AS m"
+
+
+def _sql_somar_resumo(dialeto):
+    return f"""
+        INSERT INTO resumo_metas ({_sql_colunas_resumo()}, quantidade)
+        SELECT {_sql_chave_resumo(dialeto)}, 1
+        FROM {_sql_linha_gatilho("NEW")}
+        WHERE 1 = 1
+        ON CONFLICT ({_sql_colunas_resumo()})
+        DO UPDATE SET quantidade = resumo_metas.quantidade + 1
+    """
+
+
+def _sql_subtrair_resumo(dialeto):
+    return f"""
+        UPDATE resumo_metas SET quantidade = quantidade - 1
+        WHERE ({_sql_colunas_resumo()}) = (
+            SELECT {_sql_chave_resumo(dialeto)}
+            FROM {_sql_linha_gatilho("OLD")}
+        )
+    """
+
+
+_SQL_LIMPAR_RESUMO = "DELETE FROM resumo_metas WHERE quantidade <= 0"
+
+
+def garantir_tabela_resumo(conn):
+    colunas = ", ".join(f'"{c}" TEXT NOT NULL' for c in COLUNAS_RESUMO)
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS resumo_metas (
+            {colunas},
+            quantidade INTEGER NOT NULL,
+            PRIMARY KEY ({_sql_colunas_resumo()})
+        )
+    """))
+
+
+def reconstruir_resumo_metas(conn):
+
+    # recontagem completa: um único GROUP BY sobre metas
+    garantir_tabela_resumo(conn)
+    conn.execute(text("DELETE FROM resumo_metas"))
+    conn.execute(text(f"""
+        INSERT INTO resumo_metas ({_sql_colunas_resumo()}, quantidade)
+        SELECT {_sql_chave_resumo(conn.dialect.name)}, COUNT(*)
+        FROM metas
+        GROUP BY {", ".join(str(i + 1) for i in range(len(COLUNAS_RESUMO)))}
+    """))
+
+
+def _gatilhos_resumo_existem(conn):
+
+    if conn.dialect.name == "sqlite":
+        nomes = conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'metas'"
+        )).scalars().all()
+        return all(nome in nomes for nome in _GATILHOS_SQLITE)
+
+    nomes = conn.execute(text("""
+        SELECT trigger_name FROM information_schema.triggers
+        WHERE event_object_table = 'metas'
+    """)).scalars().all()
+    return "resumo_metas_gatilho" in nomes
+
+
+def _criar_gatilhos_resumo(conn):
+
+    dialeto = conn.dialect.name
+    somar = _sql_somar_resumo(dialeto)
+    subtrair = _sql_subtrair_resumo(dialeto)
+    colunas_gatilho = ", ".join(f'"{c}"' for c in _COLUNAS_GATILHO)
+
+    if dialeto == "sqlite":
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumo_metas_inserir
+            AFTER INSERT ON metas
+            BEGIN {somar}; END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumo_metas_excluir
+            AFTER DELETE ON metas
+            BEGIN {subtrair}; {_SQL_LIMPAR_RESUMO}; END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS resumo_metas_alterar
+            AFTER UPDATE OF {colunas_gatilho} ON metas
+            BEGIN {subtrair}; {somar}; {_SQL_LIMPAR_RESUMO}; END
+        """))
+        return
+
+    # Postgres: uma função plpgsql para os três eventos
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION resumo_metas_gatilho() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN {subtrair}; END IF;
+            IF TG_OP <> 'DELETE' THEN {somar}; END IF;
+            {_SQL_LIMPAR_RESUMO};
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text("DROP TRIGGER IF EXISTS resumo_metas_gatilho ON metas"))
+    conn.execute(text(f"""
+        CREATE TRIGGER resumo_metas_gatilho
+        AFTER INSERT OR DELETE OR UPDATE OF {colunas_gatilho} ON metas
+        FOR EACH ROW EXECUTE FUNCTION resumo_metas_gatilho()
+    """))
+
+
+def garantir_resumo_metas(conn):
+
+    # True se precisou criar os gatilhos (e reconstruir o resumo)
+    if _gatilhos_resumo_existem(conn):
+        return False
+
+    garantir_tabela_resumo(conn)
+    _criar_gatilhos_resumo(conn)
+    reconstruir_resumo_metas(conn)
+    return True
+
+
+def suspender_gatilhos_resumo(conn):
+
+    # até reativar_gatilhos_resumo, na mesma transação
+    if conn.dialect.name == "sqlite":
+        # (o SQLite não tem DISABLE TRIGGER)
+        for nome in _GATILHOS_SQLITE:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+        return
+
+    # DISABLE, e não DROP: não bloqueia as leituras de metas até o commit
+    conn.execute(text("ALTER TABLE metas DISABLE TRIGGER resumo_metas_gatilho"))
+
+
+def reativar_gatilhos_resumo(conn, reconstruir=True):
+
+    # reconstruir=False só se metas não mudou desde a suspensão
+    if conn.dialect.name == "sqlite":
+        _criar_gatilhos_resumo(conn)
+    else:
+        conn.execute(text("ALTER TABLE metas ENABLE TRIGGER resumo_metas_gatilho"))
+
+    if reconstruir:
+        reconstruir_resumo_metas(conn)
+
+
+def carregar_resumo_metas(engine):
+
+    # 1️⃣ Tabela e gatilhos no lugar (metas pode ter sido recriada)
+    with engine.begin() as conn:
+        garantir_resumo_metas(conn)
+
+    # 2️⃣ Poucas linhas: uma por combinação, com a quantidade de metas
+    selecao = ", ".join(f"NULLIF(\"{c}\", '') AS \"{c}\"" for c in COLUNAS_RESUMO)
+
+    with engine.connect() as conn:
+        df = pd.read_sql(text(f"SELECT {selecao}, quantidade FROM resumo_metas"), conn)
+
+    for coluna in COLUNAS_RESUMO:
+        df[coluna] = df[coluna].astype("category")
+
+    return df
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# =====================================================
+# CACHE DE RELATÓRIOS EM DISCO
+# =====================================================
+# Os arquivos gerados (.docx/.xlsx) ficam numa pasta compartilhada por
+# todos os processos do Streamlit, com nome = hash do conteúdo que os
+# define (versão dos dados, filtros, versão do modelo do relatório).
+# Gravação atômica (arquivo temporário + os.replace), descarte LRU por
+# data de último acesso e contadores de acerto/falta num sqlite na pasta.
+
+PASTA_CACHE = os.environ.get(
+    "PDI_CACHE_RELATORIOS",
+    os.path.join(tempfile.gettempdir(), "pdi_relatorios")
+)
+
+LIMITE_BYTES = int(os.environ.get("PDI_CACHE_RELATORIOS_MB", "200")) * 1024 * 1024
+
+
+def chave_relatorio(*partes):
+    conteudo = json.dumps(partes, ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+def _conectar_contadores():
+    conn = sqlite3.connect(os.path.join(PASTA_CACHE, "contadores.db"), timeout=10)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS contadores (
+            nome TEXT PRIMARY KEY,
+            valor INTEGER
+        )
+    """)
+    return conn
+
+
+def _contar(nome):
+    try:
+        conn = _conectar_contadores()
+        with conn:
+            conn.execute("""
+                INSERT INTO contadores (nome, valor) VALUES (?, 1)
+                ON CONFLICT (nome) DO UPDATE SET valor = valor + 1
+            """, (nome,))
+        conn.close()
+    except sqlite3.Error:
+        # contador é só estatística: não pode derrubar o download
+        pass
+
+
+def _arquivos_cache():
+    arquivos = []
+    for nome in os.listdir(PASTA_CACHE):
+        if not nome.startswith("rel_"):
+            continue
+        try:
+            info = os.stat(os.path.join(PASTA_CACHE, nome))
+        except FileNotFoundError:
+            # outro processo acabou de descartar
+            continue
+        arquivos.append((info.st_mtime, info.st_size, nome))
+    return arquivos
+
+
+def _descartar_excesso():
+
+    arquivos = _arquivos_cache()
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+
+    # o mais antigo (menos usado recentemente) sai primeiro
+    for _, tamanho, nome in sorted(arquivos):
+        if total <= LIMITE_BYTES:
+            break
+        try:
+            os.remove(os.path.join(PASTA_CACHE, nome))
+            _contar("descartes")
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+
+
+def _caminho(chave, extensao):
+    return os.path.join(PASTA_CACHE, f"rel_{chave}{extensao}")
+
+
+def relatorio_em_cache(chave, extensao):
+    return os.path.exists(_caminho(chave, extensao))
+
+
+def ler_relatorio(chave, extensao):
+
+    # acerto: lê e marca como usado agora (LRU); None se não estiver no cache
+    caminho = _caminho(chave, extensao)
+    try:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        os.utime(caminho)
+    except FileNotFoundError:
+        return None
+
+    _contar("acertos")
+    return dados
+
+
+def guardar_relatorio(chave, extensao, gerar):
+
+    # garante o arquivo no cache e devolve o caminho; gerar() pode devolver
+    # bytes ou um arquivo binário aberto, copiado em blocos para o disco
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    caminho = _caminho(chave, extensao)
+
+    # 1️⃣ Acerto: marca como usado agora (LRU)
+    try:
+        os.utime(caminho)
+        _contar("acertos")
+        return caminho
+    except FileNotFoundError:
+        pass
+
+    # 2️⃣ Falta: gera e grava de forma atômica
+    _contar("faltas")
+    dados = gerar()
+
+    descritor, temporario = tempfile.mkstemp(dir=PASTA_CACHE, prefix="tmp_")
+    try:
+        with os.fdopen(descritor, "wb") as f:
+            if isinstance(dados, bytes):
+                f.write(dados)
+            else:
+                with dados:
+                    shutil.copyfileobj(dados, f)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    # 3️⃣ Mantém a pasta dentro do limite
+    _descartar_excesso()
+
+    return caminho
+
+
+def obter_relatorio(chave, extensao, gerar):
+
+    caminho = guardar_relatorio(chave, extensao, gerar)
+
+    try:
+        with open(caminho, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        # descartado por outro processo entre a gravação e a leitura
+        dados = gerar()
+        return dados if isinstance(dados, bytes) else dados.read()
+
+
+def estatisticas_cache():
+
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+
+    conn = _conectar_contadores()
+    contadores = dict(conn.execute("SELECT nome, valor FROM contadores").fetchall())
+    conn.close()
+
+    arquivos = _arquivos_cache()
+
+    return {
+        "acertos": contadores.get("acertos", 0),
+        "faltas": contadores.get("faltas", 0),
+        "descartes": contadores.get("descartes", 0),
+        "arquivos": len(arquivos),
+        "bytes": sum(tamanho for _, tamanho, _ in arquivos),
+        "limite_bytes": LIMITE_BYTES
+    }
@@ -0,0 +1,255 @@
+import re
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+# ----------------------------
+# SITUAÇÕES TEMPORAIS (execucao2)
+# ----------------------------
+
+situacoes_exec2 = [
+    "A EXECUTAR",
+    "EXECUÇÃO PENDENTE",
+    "EM EXECUÇÃO",
+    "EXECUÇÃO ANTECIPADA",
+    "ATRASADA",
+    "CUMPRIDA NO PRAZO",
+    "CUMPRIDA ANTECIPADA",
+    "CUMPRIDA COM ATRASO",
+    "NÃO INICIADA"
+]
+
+situacoes_em_curso = ["INICIADA", "EM ANDAMENTO", "AVANÇADA"]
+
+
+# ----------------------------
+# Função segura para converter inteiro
+# ----------------------------
+# Aceita só número decimal simples: sinal opcional, dígitos com no máximo
+# um ponto e expoente opcional ("2024", "2024.0", "2.024e3"), sem os
+# espaços ASCII das pontas. É a mesma regra de anos_seguros e de
+# _sql_inteiro: float() sozinho aceitaria também "1_000", "inf" e
+# dígitos não ASCII, que o banco não reconhece como número.
+_PADRAO_NUMERO = re.compile(r"[+-]?([0-9]+[.]?[0-9]*|[.][0-9]+)([eE][+-]?[0-9]+)?")
+_ESPACOS = " \t\n\r\x0b\x0c"
+
+# valores que anos_seguros converte direto, sem passar pelo texto
+_TIPOS_NUMERICOS = [int, float, np.int64, np.int32, np.float64, np.float32]
+
+
+def inteiro_seguro(valor):
+    try:
+        if valor is None:
+            return None
+        valor = str(valor).strip(_ESPACOS)
+        if not _PADRAO_NUMERO.fullmatch(valor):
+            return None
+        return int(float(valor))
+    except:
+        return None
+
+
+# ----------------------------
+# Função de classificação (linha a linha)
+# ----------------------------
+def classificar_execucao2(row):
+
+    hoje = datetime.now().year
+
+    execucao = row["execucao"]
+    inicio = inteiro_seguro(row["Inicio"])
+    fim = inteiro_seguro(row["Fim"])
+    ano_conclusao = inteiro_seguro(row["Ano_Conclusao"])
+
+    if execucao == "NÃO INICIADA" and inicio is not None and hoje >= inicio:
+        return "EXECUÇÃO PENDENTE"
+
+    if execucao != "CONCLUÍDA" and fim is not None and hoje > fim:
+        return "ATRASADA"
+
+    if execucao == "NÃO INICIADA" and inicio is not None and hoje < inicio:
+        return "A EXECUTAR"
+
+    if execucao in situacoes_em_curso:
+        if inicio is not None and fim is not None and inicio <= hoje <= fim:
+            return "EM EXECUÇÃO"
+
+    if execucao in situacoes_em_curso:
+        if inicio is not None and hoje < inicio:
+            return "EXECUÇÃO ANTECIPADA"
+
+    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
+        if inicio is not None and fim is not None and inicio <= ano_conclusao <= fim:
+            return "CUMPRIDA NO PRAZO"
+
+    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
+        if inicio is not None and ano_conclusao < inicio:
+            return "CUMPRIDA ANTECIPADA"
+
+    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
+        if fim is not None and ano_conclusao > fim:
+            return "CUMPRIDA COM ATRASO"
+
+    return "NÃO INICIADA"
+
+
+# ----------------------------
+# Versão vetorizada
+# ----------------------------
+def anos_seguros(valores):
+    # mesmo resultado de inteiro_seguro, mas para a coluna inteira:
+    # NaN onde o valor não é um número finito
+    serie = pd.Series(valores)
+
+    if pd.api.types.is_bool_dtype(serie):
+        return np.full(len(serie), np.nan)
+
+    # coluna de texto (ou misturada): o que não é int/float passa pelo
+    # mesmo padrão de inteiro_seguro antes de converter (to_numeric
+    # aceitaria "8e 77"); str() também recusa True/False, que to_numeric
+    # converteria em 1/0
+    if serie.dtype == object or pd.api.types.is_string_dtype(serie):
+        outros = ~serie.map(type).isin(_TIPOS_NUMERICOS).to_numpy(dtype=bool)
+        if outros.any():
+            texto = serie[outros].map(str).str.strip(_ESPACOS)
+            serie = serie.astype(object)
+            serie[outros] = texto.where(texto.str.fullmatch(_PADRAO_NUMERO.pattern))
+
+    numeros = pd.to_numeric(serie, errors="coerce")
+    anos = np.trunc(numeros.to_numpy(dtype="float64", na_value=np.nan))
+    anos[~np.isfinite(anos)] = np.nan
+
+    return anos
+
+
+def classificar_execucao2_vetorizado(df, hoje=None):
+
+    if hoje is None:
+        hoje = datetime.now().year
+
+    execucao = df["execucao"]
+    inicio = anos_seguros(df["Inicio"])
+    fim = anos_seguros(df["Fim"])
+    ano_conclusao = anos_seguros(df["Ano_Conclusao"])
+
+    nao_iniciada = execucao.eq("NÃO INICIADA").to_numpy(dtype=bool)
+    concluida = execucao.eq("CONCLUÍDA").to_numpy(dtype=bool)
+    em_curso = execucao.isin(situacoes_em_curso).to_numpy(dtype=bool)
+
+    # comparações com NaN são sempre falsas, como o "is not None" da versão linha a linha
+    condicoes = [
+        nao_iniciada & (hoje >= inicio),
+        ~concluida & (hoje > fim),
+        nao_iniciada & (hoje < inicio),
+        em_curso & (inicio <= hoje) & (hoje <= fim),
+        em_curso & (hoje < inicio),
+        concluida & (inicio <= ano_conclusao) & (ano_conclusao <= fim),
+        concluida & (ano_conclusao < inicio),
+        concluida & (ano_conclusao > fim),
+    ]
+    resultados = [
+        "EXECUÇÃO PENDENTE",
+        "ATRASADA",
+        "A EXECUTAR",
+        "EM EXECUÇÃO",
+        "EXECUÇÃO ANTECIPADA",
+        "CUMPRIDA NO PRAZO",
+        "CUMPRIDA ANTECIPADA",
+        "CUMPRIDA COM ATRASO",
+    ]
+
+    # np.select respeita a ordem das regras: vale a primeira condição verdadeira
+    codigos = np.select(
+        condicoes,
+        [situacoes_exec2.index(r) for r in resultados],
+        default=situacoes_exec2.index("NÃO INICIADA")
+    )
+
+    return pd.Series(
+        pd.Categorical.from_codes(codigos, categories=situacoes_exec2),
+        index=df.index,
+        name="execucao2"
+    )
+
+
+# ----------------------------
+# Versão SQL (view metas_temporal)
+# ----------------------------
+# maior double finito: acima dele float() dá infinito
+_SQL_MAIOR_REAL = "1.7976931348623157e308"
+
+
+def _sql_inteiro(coluna, dialeto):
+
+    # equivalente SQL de inteiro_seguro: NULL quando não é número
+    if dialeto == "sqlite":
+        # o SQLite não tem expressão regular: o padrão de _PADRAO_NUMERO
+        # sai em GLOBs sobre o texto sem os espaços das pontas
+        texto = f"TRIM({coluna}, ' ' || char(9, 10, 11, 12, 13))"
+        numero = f"CAST({texto} AS REAL)"
+        return f"""(CASE
+            WHEN typeof({coluna}) IN ('integer', 'real')
+                 AND ABS({coluna}) <= {_SQL_MAIOR_REAL}
+                THEN CAST({coluna} AS INTEGER)
+            WHEN typeof({coluna}) = 'text'
+                 -- só sinal, dígitos, ponto e expoente
+                 AND {texto} NOT GLOB '*[^0-9.eE+-]*'
+                 -- um dígito antes do expoente (ou em algum lugar, sem expoente)
+                 AND ({texto} GLOB '*[0-9]*[eE]*'
+                      OR ({texto} GLOB '*[0-9]*' AND {texto} NOT GLOB '*[eE]*'))
+                 -- no máximo um ponto e um expoente, e o ponto antes dele
+                 AND {texto} NOT GLOB '*.*.*'
+                 AND {texto} NOT GLOB '*[eE]*[eE]*'
+                 AND {texto} NOT GLOB '*[eE]*.*'
+                 -- sinal só no começo ou logo depois do "e"
+                 AND {texto} NOT GLOB '*[^eE][+-]*'
+                 -- expoente com dígitos
+                 AND {texto} NOT GLOB '*[eE]'
+                 AND {texto} NOT GLOB '*[eE][+-]'
+                 -- float("1e400") é infinito: inteiro_seguro devolve None
+                 AND ABS({numero}) <= {_SQL_MAIOR_REAL}
+                THEN CAST({numero} AS INTEGER)
+        END)"""
+
+    # Postgres: a mesma expressão regular, e a conversão por double
+    # precision para truncar como int(float(...)) no Python (abaixo de 1
+    # é 0 direto: o double recusa o que o float do Python zera, "1e-400")
+    texto = f"BTRIM(CAST({coluna} AS TEXT), ' ' || CHR(9) || CHR(10) || CHR(11) || CHR(12) || CHR(13))"
+    numero = f"ABS(CAST({texto} AS NUMERIC))"
+    return f"""(CASE
+            WHEN {texto} ~ '^{_PADRAO_NUMERO.pattern}$' THEN
+                CASE
+                    WHEN {numero} > {_SQL_MAIOR_REAL} THEN NULL
+                    WHEN {numero} < 1 THEN 0
+                    ELSE TRUNC(CAST({texto} AS DOUBLE PRECISION))
+                END
+        END)"""
+
+
+def sql_execucao2(dialeto, hoje=None):
+
+    # mesmas regras de classificar_execucao2, na mesma ordem, como CASE
+    if hoje is not None:
+        hoje = str(int(hoje))
+    elif dialeto == "sqlite":
+        hoje = "CAST(strftime('%Y', 'now', 'localtime') AS INTEGER)"
+    else:
+        hoje = "CAST(EXTRACT(YEAR FROM CURRENT_DATE) AS INTEGER)"
+
+    inicio = _sql_inteiro('"Inicio"', dialeto)
+    fim = _sql_inteiro('"Fim"', dialeto)
+    ano = _sql_inteiro('"Ano_Conclusao"', dialeto)
+    em_curso = ", ".join(f"'{s}'" for s in situacoes_em_curso)
+
+    return f"""CASE
+        WHEN execucao = 'NÃO INICIADA' AND {hoje} >= {inicio} THEN 'EXECUÇÃO PENDENTE'
+        WHEN COALESCE(execucao, '') <> 'CONCLUÍDA' AND {hoje} > {fim} THEN 'ATRASADA'
+        WHEN execucao = 'NÃO INICIADA' AND {hoje} < {inicio} THEN 'A EXECUTAR'
+        WHEN execucao IN ({em_curso}) AND {inicio} <= {hoje} AND {hoje} <= {fim} THEN 'EM EXECUÇÃO'
+        WHEN execucao IN ({em_curso}) AND {hoje} < {inicio} THEN 'EXECUÇÃO ANTECIPADA'
+        WHEN execucao = 'CONCLUÍDA' AND {inicio} <= {ano} AND {ano} <= {fim} THEN 'CUMPRIDA NO PRAZO'
+        WHEN execucao = 'CONCLUÍDA' AND {ano} < {inicio} THEN 'CUMPRIDA ANTECIPADA'
+        WHEN execucao = 'CONCLUÍDA' AND {ano} > {fim} THEN 'CUMPRIDA COM ATRASO'
+        ELSE 'NÃO INICIADA'
+    END"""
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolEsgotado
+from sqlalchemy.pool import QueuePool
+
+# =====================================================
+# FÁBRICA DE ENGINES (POOL DE CONEXÕES)
+# =====================================================
+# Todas as páginas pegam a engine daqui (get_engine de cada página só
+# escolhe a URL e guarda a engine com st.cache_resource). As conexões
+# ficam abertas no pool e são reaproveitadas entre os reruns e entre as
+# sessões, em vez de abrir uma conexão nova a cada consulta.
+#
+# Ajustes por variável de ambiente (mesmo padrão de fila_relatorios.py):
+#     PDI_POOL_TAMANHO      conexões mantidas abertas (padrão 5)
+#     PDI_POOL_EXTRA        conexões além do tamanho em picos (padrão 10)
+#     PDI_POOL_ESPERA       segundos esperando uma conexão livre (padrão 30)
+#     PDI_POOL_RECICLAR     segundos até reabrir uma conexão (padrão 1800)
+#     PDI_TEMPO_CONSULTA_MS limite de cada comando no Postgres (padrão 60000)
+#     PDI_SQLITE_ESPERA_MS  espera por um banco SQLite travado (padrão 5000)
+
+POOL_TAMANHO = int(os.environ.get("PDI_POOL_TAMANHO", "5"))
+POOL_EXTRA = int(os.environ.get("PDI_POOL_EXTRA", "10"))
+POOL_ESPERA = float(os.environ.get("PDI_POOL_ESPERA", "30"))
+POOL_RECICLAR = int(os.environ.get("PDI_POOL_RECICLAR", "1800"))
+TEMPO_CONSULTA_MS = int(os.environ.get("PDI_TEMPO_CONSULTA_MS", "60000"))
+SQLITE_ESPERA_MS = int(os.environ.get("PDI_SQLITE_ESPERA_MS", "5000"))
+
+# ajustes de cada conexão SQLite (ver _ajustar_sqlite)
+PRAGMAS_SQLITE = {
+    # WAL: leitores não bloqueiam quem grava e vice-versa; vale para o
+    # arquivo, fica gravado no banco.db (e cria banco.db-wal/-shm ao lado)
+    "journal_mode": "WAL",
+    # quanto esperar por outra gravação antes de "database is locked"
+    "busy_timeout": SQLITE_ESPERA_MS,
+    # com WAL, NORMAL só sincroniza o disco nos checkpoints: uma queda de
+    # energia pode perder as últimas gravações, mas não corrompe o banco
+    "synchronous": "NORMAL",
+    # leitura do arquivo por mmap (até 256 MB) e cache de 32 MB por conexão
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -32000,
+}
+
+
+def _novas_estatisticas():
+    return {
+        "retiradas": 0,
+        "espera_total": 0.0,
+        "espera_maxima": 0.0,
+        "com_pool_cheio": 0,
+        "esgotamentos": 0,
+        "conexoes_abertas": 0
+    }
+
+
+class PoolMedido(QueuePool):
+
+    # QueuePool que mede quanto cada retirada de conexão esperou e conta
+    # as vezes em que o pool estava cheio (todas as conexões em uso) ou
+    # esgotou o tempo de espera (ver estatisticas_pool)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estatisticas = _novas_estatisticas()
+        self._estatisticas_lock = threading.Lock()
+
+    def recreate(self):
+        # dispose() recria o pool: os contadores continuam no novo
+        novo = super().recreate()
+        novo.estatisticas = self.estatisticas
+        novo._estatisticas_lock = self._estatisticas_lock
+        return novo
+
+    def _create_connection(self):
+        with self._estatisticas_lock:
+            self.estatisticas["conexoes_abertas"] += 1
+        return super()._create_connection()
+
+    def _do_get(self):
+        cheio = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        inicio = time.perf_counter()
+        esgotou = False
+
+        try:
+            return super()._do_get()
+        except PoolEsgotado:
+            esgotou = True
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._estatisticas_lock:
+                e = self.estatisticas
+                e["retiradas"] += 1
+                e["espera_total"] += espera
+                e["espera_maxima"] = max(e["espera_maxima"], espera)
+                e["com_pool_cheio"] += cheio
+                e["esgotamentos"] += esgotou
+
+
+def _ajustar_sqlite(engine):
+
+    # os mesmos PRAGMAs em toda conexão aberta pelo pool
+    @event.listens_for(engine, "connect")
+    def _ao_conectar(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        for pragma, valor in PRAGMAS_SQLITE.items():
+            cursor.execute(f"PRAGMA {pragma} = {valor}")
+        cursor.close()
+
+
+def _limitar_tempo_consulta(engine):
+
+    # limite de cada comando, na abertura de cada conexão do pool (por
+    # evento e não pelo "options" da URL, que o pgbouncer recusa)
+    @event.listens_for(engine, "connect")
+    def _ao_conectar(conexao_dbapi, registro):
+        with conexao_dbapi.cursor() as cursor:
+            cursor.execute(f"SET statement_timeout = {TEMPO_CONSULTA_MS}")
+        conexao_dbapi.commit()
+
+
+def criar_engine(url, **opcoes):
+
+    opcoes = {
+        "poolclass": PoolMedido,
+        "pool_size": POOL_TAMANHO,
+        "max_overflow": POOL_EXTRA,
+        "pool_timeout": POOL_ESPERA,
+        **opcoes
+    }
+
+    # 1️⃣ SQLite: conexões persistentes no pool, compartilhadas entre as
+    # threads (cada rerun do Streamlit roda numa thread nova: uma conexão
+    # por thread seria aberta e descartada a cada rerun); sem pre-ping nem
+    # reciclagem, que só fazem sentido com servidor
+    if url.startswith("sqlite"):
+        opcoes.setdefault("connect_args", {"check_same_thread": False})
+        engine = create_engine(url, **opcoes)
+        _ajustar_sqlite(engine)
+        return engine
+
+    # 2️⃣ Postgres: o pre-ping descarta conexões derrubadas pelo servidor e a
+    # reciclagem renova as antigas antes que algum firewall as corte
+    opcoes.setdefault("pool_pre_ping", True)
+    opcoes.setdefault("pool_recycle", POOL_RECICLAR)
+
+    engine = create_engine(url, **opcoes)
+    _limitar_tempo_consulta(engine)
+    return engine
+
+
+def estatisticas_pool(engine):
+
+    # contadores do pool para o Diagnóstico dos painéis
+    pool = engine.pool
+    e = dict(pool.estatisticas)
+    retiradas = e["retiradas"]
+
+    return {
+        **e,
+        "espera_media_ms": 1000 * e["espera_total"] / retiradas if retiradas else 0.0,
+        "espera_maxima_ms": 1000 * e["espera_maxima"],
+        "em_uso": pool.checkedout(),
+        "livres": pool.checkedin(),
+        "tamanho": pool.size()
+    }
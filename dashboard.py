@@ -1,15 +1,22 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
 import altair as alt
-from io import BytesIO
-from docx import Document
-from docx.shared import Inches
-from datetime import datetime
 from streamlit_oauth import OAuth2Component
 import jwt
+from classificacao import situacoes_exec2
+from banco import (
+    carregar_metas,
+    carregar_resumo_metas,
+    garantir_view_metas_temporal,
+    ler_versao_dados,
+    recalcular_execucao2_virada_de_ano
+)
+from cache_relatorios import chave_relatorio
+from conexao import criar_engine
+from modelo import contar, filtrar, materializar, montar_cubo, montar_modelo, opcoes
+from fila_relatorios import painel_relatorio
+from relatorios import VERSAO_MODELO_RELATORIO, gerar_excel, gerar_relatorio_word_graficos_modelo
 
 alt.data_transformers.disable_max_rows()
 
@@ -121,356 +128,54 @@ if st.sidebar.button("Sair"):
 # CONEXÃO
 # --------------------------
 
-def conectar():
-    return sqlite3.connect("banco.db")
-
-def carregar_dados():
-    conn = conectar()
-    df = pd.read_sql("SELECT * FROM metas", conn)
-    conn.close()
-    return df
-
-
-# ----------------------------
-# Função segura para converter inteiro
-# ----------------------------
-def inteiro_seguro(valor):
-    try:
-        if valor is None:
-            return None
-        valor = str(valor).strip()
-        if valor == "":
-            return None
-        return int(float(valor))
-    except:
-        return None
-
-
-# ----------------------------
-# Função de classificação
-# ----------------------------
-def classificar_execucao2(row):
-
-    hoje = datetime.now().year
-
-    execucao = row["execucao"]
-    inicio = inteiro_seguro(row["Inicio"])
-    fim = inteiro_seguro(row["Fim"])
-    ano_conclusao = inteiro_seguro(row["Ano_Conclusao"])
-
-    if execucao == "NÃO INICIADA" and inicio is not None and hoje >= inicio:
-        return "EXECUÇÃO PENDENTE"
-
-    if execucao != "CONCLUÍDA" and fim is not None and hoje > fim:
-        return "ATRASADA"
-
-    if execucao == "NÃO INICIADA" and inicio is not None and hoje < inicio:
-        return "A EXECUTAR"
-
-    if execucao in ["INICIADA", "EM ANDAMENTO", "AVANÇADA"]:
-        if inicio is not None and fim is not None and inicio <= hoje <= fim:
-            return "EM EXECUÇÃO"
-
-    if execucao in ["INICIADA", "EM ANDAMENTO", "AVANÇADA"]:
-        if inicio is not None and hoje < inicio:
-            return "EXECUÇÃO ANTECIPADA"
-
-    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
-        if inicio is not None and fim is not None and inicio <= ano_conclusao <= fim:
-            return "CUMPRIDA NO PRAZO"
+# pool de conexões compartilhado por todas as sessões (ver conexao.py)
+@st.cache_resource
+def get_engine():
+    return criar_engine("sqlite:///banco.db")
 
-    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
-        if inicio is not None and ano_conclusao < inicio:
-            return "CUMPRIDA ANTECIPADA"
+# colunas usadas por esta página e pelo relatório Word
+COLUNAS_PAINEL = ["Eixo", "Meta", "Descrição da Meta", "Resp_1", "execucao", "execucao2"]
 
-    if execucao == "CONCLUÍDA" and ano_conclusao is not None:
-        if fim is not None and ano_conclusao > fim:
-            return "CUMPRIDA COM ATRASO"
+# colunas dos filtros da barra lateral (com índice de bitmaps no modelo)
+COLUNAS_FILTRO = ["Resp_1", "execucao", "Eixo"]
 
-    return "NÃO INICIADA"
+# dimensões do cubo de contagens (ver modelo.montar_cubo)
+DIMENSOES_CUBO = ["Resp_1", "Eixo", "execucao", "execucao2"]
 
-def atualizar_execucao2():
-    conn = conectar()
-    df_temp = pd.read_sql("SELECT rowid,* FROM metas", conn)
-    cursor = conn.cursor()
-
-    cursor.execute("PRAGMA table_info(metas)")
-    colunas = [c[1] for c in cursor.fetchall()]
-
-    if "execucao2" not in colunas:
-        cursor.execute("ALTER TABLE metas ADD COLUMN execucao2 TEXT")
-        conn.commit()
-
-    df_temp["execucao2"] = df_temp.apply(classificar_execucao2, axis=1)
-
-    for _, row in df_temp.iterrows():
-        cursor.execute(
-            "UPDATE metas SET execucao2=? WHERE rowid=?",
-            (row["execucao2"], row["rowid"])
-        )
-
-    conn.commit()
-    conn.close()
-
-
-# --------------------------
-# GERAR EXCEL
-# --------------------------
-
-def gerar_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Metas")
-    return output.getvalue()
-
-# --------------------------
-# GERAR WORD (ACRESCENTADO) com txto automatico
-# --------------------------
-def gerar_texto_relatorio(df):
-
-    total = len(df)
-
-    resumo = (
-        df.groupby("execucao")
-        .size()
-        .reset_index(name="Quantidade")
-        .sort_values("Quantidade", ascending=False)
-    )
+# filtros, KPIs e gráficos saem do resumo_metas, mantido pelo banco
+# (ver banco.py): poucas centenas de linhas, não importa quantas metas haja
+@st.cache_resource(max_entries=2, show_spinner=False)
+def carregar_resumo(versao):
+    tabela = carregar_resumo_metas(get_engine())
+    pesos = tabela.pop("quantidade").to_numpy()
+    resumo = montar_modelo(tabela)
+    resumo["cubo"] = montar_cubo(resumo, DIMENSOES_CUBO, pesos)
+    return resumo
 
-    resumo["Percentual"] = (resumo["Quantidade"] / total * 100).round(1)
-
-    ranking = (
-        df.groupby("Resp_1")
-        .size()
-        .reset_index(name="Quantidade")
-        .sort_values("Quantidade", ascending=False)
-    )
-
-    top_resps = ranking.head(5)
-
-    if "Eixo" in df.columns:
-        eixo = (
-            df.groupby("Eixo")
-            .size()
-            .reset_index(name="Total")
-            .sort_values("Total", ascending=False)
-        )
-    else:
-        eixo = None
-
-    maior = resumo.iloc[0]["execucao"]
-    segundo = resumo.iloc[1]["execucao"]
-
-    texto = f"""
-1. Análise Geral da Execução das Metas
-
-A análise do painel gerencial indica um total de {total} metas institucionais registradas no sistema de acompanhamento.
-
-Observa-se que a maior parte das metas encontra-se nas fases “{maior}” e “{segundo}”, indicando que as ações previstas no planejamento estratégico encontram-se em processo de execução.
-
-De modo geral, o cenário evidencia um nível moderado de execução das metas.
-
-3. Execução por Responsável
-"""
-
-    for _, row in top_resps.iterrows():
-        texto += f"\n{row['Resp_1']} – {row['Quantidade']} metas"
-
-    if eixo is not None:
-
-        texto += "\n\n4. Execução das Metas por Eixo Estratégico\n"
-
-        for _, row in eixo.iterrows():
-            texto += f"\n{row['Eixo']} – {row['Total']} metas"
-
-    return texto
-
-
-
-
-def gerar_relatorio_word(df):
-
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from datetime import datetime
-
-    document = Document()
-
-    # -------------------
-    # CAPA
-    # -------------------
-
-    document.add_heading("RELATÓRIO GERENCIAL DE METAS", level=0)
-
-    p = document.add_paragraph()
-    p.add_run("Sistema de Acompanhamento de Metas\n").bold = True
-    p.add_run(f"Data de geração: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    document.add_page_break()
-
-    # TEXTO ANALÍTICO AUTOMÁTICO
-    document.add_heading("Análise Gerencial das Metas", level=1)
-
-    #texto = gerar_texto_relatorio(df)
-
-    # garante que sempre apareça
-    #if texto:
-    #    for linha in texto.split("\n"):
-    #        document.add_paragraph(linha)
-    #else:
-    #    document.add_paragraph("Análise automática não disponível.")
-
-    document.add_paragraph("TESTE TEXTO AUTOMÁTICO")
-
-     # --------------------------------------------------------------------------
-     # RESUMO GERAL
-     # ---------------------------------------------------------------------------
-
-    document.add_heading("1. Resumo Geral", level=1)
-
-    resumo = (
-        df.groupby("execucao")
-        .size()
-        .reset_index(name="Quantidade")
-        .sort_values("Quantidade", ascending=False)
-    )
-
-    total = resumo["Quantidade"].sum()
-    resumo["Percentual (%)"] = (resumo["Quantidade"] / total * 100).round(1)
-
-    tabela = document.add_table(rows=1, cols=3)
-    cab = tabela.rows[0].cells
-    cab[0].text = "Situação"
-    cab[1].text = "Quantidade"
-    cab[2].text = "Percentual (%)"
-
-    for _, row in resumo.iterrows():
-        linha = tabela.add_row().cells
-        linha[0].text = str(row["execucao"])
-        linha[1].text = str(row["Quantidade"])
-        linha[2].text = str(row["Percentual (%)"])
-
-    # gráfico geral
-    fig, ax = plt.subplots()
-    ax.bar(resumo["execucao"], resumo["Quantidade"])
-    ax.set_title("Situação Geral das Metas")
-    plt.xticks(rotation=45)
-
-    img_stream = BytesIO()
-    plt.tight_layout()
-    plt.savefig(img_stream, format="png")
-    plt.close(fig)
-
-    document.add_picture(img_stream, width=Inches(5))
-
-    # -------------------
-    # PERCENTUAL POR EIXO
-    # -------------------
-
-    if "Eixo" in df.columns:
-
-        document.add_page_break()
-        document.add_heading("2. Execução por Eixo", level=1)
-
-        resumo_eixo = (
-            df.groupby(["Eixo", "execucao"])
-            .size()
-            .reset_index(name="Quantidade")
-        )
-
-        tabela_eixo_total = (
-            df.groupby("Eixo")
-            .size()
-            .reset_index(name="Total")
-        )
-
-        # gráfico comparativo por eixo
-        fig, ax = plt.subplots()
-
-        eixo_counts = df["Eixo"].value_counts()
-        ax.bar(eixo_counts.index, eixo_counts.values)
-        ax.set_title("Quantidade de Metas por Eixo")
-        plt.xticks(rotation=45)
-
-        img_stream = BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png")
-        plt.close(fig)
-
-        document.add_picture(img_stream, width=Inches(5))
-
-        # tabela de totais
-        tabela = document.add_table(rows=1, cols=2)
-        cab = tabela.rows[0].cells
-        cab[0].text = "Eixo"
-        cab[1].text = "Total de Metas"
-
-        for _, row in tabela_eixo_total.iterrows():
-            linha = tabela.add_row().cells
-            linha[0].text = str(row["Eixo"])
-            linha[1].text = str(row["Total"])
-
-    # -------------------
-    # RANKING RESPONSÁVEIS
-    # -------------------
-
-    if "Resp_1" in df.columns:
-
-        document.add_page_break()
-        document.add_heading("3. Ranking de Responsáveis", level=1)
-
-        ranking = (
-            df.groupby("Resp_1")
-            .size()
-            .reset_index(name="Quantidade")
-            .sort_values("Quantidade", ascending=False)
-        )
-
-        tabela = document.add_table(rows=1, cols=2)
-        cab = tabela.rows[0].cells
-        cab[0].text = "Responsável"
-        cab[1].text = "Total de Metas"
-
-        for _, row in ranking.iterrows():
-            linha = tabela.add_row().cells
-            linha[0].text = str(row["Resp_1"])
-            linha[1].text = str(row["Quantidade"])
-
-        # gráfico ranking
-        fig, ax = plt.subplots()
-        ax.bar(ranking["Resp_1"], ranking["Quantidade"])
-        ax.set_title("Ranking de Responsáveis")
-        plt.xticks(rotation=45)
-
-        img_stream = BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png")
-        plt.close(fig)
-
-        document.add_picture(img_stream, width=Inches(5))
-
-    # -------------------
-    # FINALIZA
-    # -------------------
-
-    buffer = BytesIO()
-    document.save(buffer)
-    return buffer.getvalue()
+# as metas linha a linha (tabela detalhada e relatório Word): um único
+# modelo por versão dos dados, o mesmo objeto para todas as sessões do
+# processo (somente leitura, ver modelo.py); cada sessão só guarda os
+# índices dos seus filtros
+# (app2.salvar_alteracoes incrementa a versão a cada gravação)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def carregar_dados(versao):
+    return montar_modelo(carregar_metas(get_engine(), COLUNAS_PAINEL), COLUNAS_FILTRO)
 
 
 # --------------------------------------------------------------------------
 # CARREGAR DADOS
 # --------------------------------------------------------------------------
-atualizar_execucao2()
-df_original = carregar_dados()
+recalcular_execucao2_virada_de_ano(get_engine())
+garantir_view_metas_temporal(get_engine())
+versao = ler_versao_dados(get_engine())
+resumo = carregar_resumo(versao)
 
 
-if df_original.empty:
+if resumo["linhas"] == 0:
     st.warning("Nenhuma meta encontrada no banco.")
     st.stop()
 
-df_original["execucao"] = df_original["execucao"].replace("", None)
-df_original["execucao"] = df_original["execucao"].fillna("NÃO INICIADA")
+# execucao já vem normalizada do banco (vazio ou nulo = "NÃO INICIADA")
 
 situacoes_padrao = [
     "NÃO INICIADA",
@@ -488,18 +193,6 @@ paleta = {
     "CONCLUÍDA": "#2ca02c"
 }
 
-situacoes_exec2 = [
-    "A EXECUTAR",
-    "EXECUÇÃO PENDENTE",
-    "EM EXECUÇÃO",
-    "EXECUÇÃO ANTECIPADA",
-    "ATRASADA",
-    "CUMPRIDA NO PRAZO",
-    "CUMPRIDA ANTECIPADA",
-    "CUMPRIDA COM ATRASO",
-    "NÃO INICIADA"
-]
-
 paleta_exec2 = {
     "A EXECUTAR": "#4e79a7",
     "EXECUÇÃO PENDENTE": "#f28e2b",
@@ -519,9 +212,9 @@ paleta_exec2 = {
 
 st.sidebar.title("Filtros")
 
-responsaveis = ["Todos"] + sorted(df_original["Resp_1"].dropna().unique())
+responsaveis = ["Todos"] + opcoes(resumo, "Resp_1")
 situacoes = ["Todos"] + situacoes_padrao
-eixos = ["Todos"] + sorted(df_original["Eixo"].dropna().unique())
+eixos = ["Todos"] + opcoes(resumo, "Eixo")
 
 responsavel_sel = st.sidebar.selectbox("Responsável", responsaveis)
 situacao_sel = st.sidebar.selectbox("Situação", situacoes)
@@ -534,42 +227,29 @@ eixo_sel = st.sidebar.selectbox("Eixo", eixos)
 st.sidebar.markdown("---")
 st.sidebar.subheader("Exportação")
 
-excel_bytes = gerar_excel(df_original)
-
-st.sidebar.download_button(
-    label="Baixar base em Excel",
-    data=excel_bytes,
-    file_name="metas.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
-
-# --------------------------
-# BOTÃO WORD (ACRESCENTADO)
-# --------------------------
-
-word_bytes = gerar_relatorio_word(df_original)
-
-st.sidebar.download_button(
-    label="Baixar relatório em Word",
-    data=word_bytes,
-    file_name="relatorio_metas.docx",
-    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-)
+# os arquivos são gerados em segundo plano (fila_relatorios.py), só quando
+# o usuário pede, e ficam em cache pela versão dos dados
+
+with st.sidebar:
+    painel_relatorio(
+        "Baixar base em Excel",
+        chave_relatorio("dashboard_excel", "banco.db", versao, VERSAO_MODELO_RELATORIO),
+        ".xlsx",
+        "metas.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        gerar_excel,
+        "sqlite:///banco.db"
+    )
 
 # --------------------------
 # APLICAR FILTROS
 # --------------------------
 
-df = df_original.copy()
-
-if responsavel_sel != "Todos":
-    df = df[df["Resp_1"] == responsavel_sel]
-
-if situacao_sel != "Todos":
-    df = df[df["execucao"] == situacao_sel]
-
-if eixo_sel != "Todos":
-    df = df[df["Eixo"] == eixo_sel]
+filtros_sel = {
+    "Resp_1": responsavel_sel,
+    "execucao": situacao_sel,
+    "Eixo": eixo_sel
+}
 
 # --------------------------
 # DASHBOARD
@@ -577,7 +257,11 @@ if eixo_sel != "Todos":
 
 st.title("Painel Gerencial de Metas")
 
-total_metas = len(df)
+# KPIs, gráficos e tabelas saem do cubo de contagens do resumo
+# (fatia + soma), sem ler as metas
+cubo = resumo["cubo"]
+
+total_metas = contar(resumo, cubo, filtros_sel)
 st.metric("Total de Metas", total_metas)
 
 st.divider()
@@ -588,9 +272,14 @@ st.divider()
 
 st.subheader("Situação Geral das Metas")
 
+por_situacao = (
+    contar(resumo, cubo, filtros_sel, ["execucao"])
+    .set_index("execucao")["Quantidade"]
+)
+
 dados = []
 for s in situacoes_padrao:
-    qtd = df[df["execucao"] == s].shape[0]
+    qtd = int(por_situacao.get(s, 0))
     perc = (qtd / total_metas * 100) if total_metas else 0
     dados.append([s, qtd, round(perc,1)])
 
@@ -650,11 +339,7 @@ st.divider()
 
 st.subheader("Execução por Responsável")
 
-tabela_resp = (
-    df.groupby(["Resp_1", "execucao"])
-    .size()
-    .reset_index(name="Quantidade")
-)
+tabela_resp = contar(resumo, cubo, filtros_sel, ["Resp_1", "execucao"])
 
 altura = max(200, 25 * tabela_resp["Resp_1"].nunique())
 
@@ -692,16 +377,16 @@ st.divider()
 
 st.subheader("Resumo de Metas por Eixo e Situação")
 
-if "Eixo" not in df.columns:
+if "Eixo" not in resumo["colunas"]:
     st.warning("A coluna 'Eixo' não existe na tabela metas.")
 else:
 
     tabela_eixo = pd.pivot_table(
-        df,
+        contar(resumo, cubo, filtros_sel, ["Eixo", "execucao"]),
         index="Eixo",
         columns="execucao",
-        values="Meta",
-        aggfunc="count",
+        values="Quantidade",
+        aggfunc="sum",
         fill_value=0
     )
 
@@ -714,6 +399,32 @@ else:
 
     st.dataframe(tabela_eixo, use_container_width=True)
 
+# --------------------------
+# METAS FILTRADAS (LINHA A LINHA)
+# --------------------------
+# carregadas só aqui, depois dos gráficos: na troca de versão dos dados
+# o painel já aparece enquanto as metas são lidas
+modelo = carregar_dados(versao)
+
+indices = filtrar(modelo, filtros_sel)
+
+df = materializar(modelo, indices)
+
+# --------------------------
+# BOTÃO WORD (ACRESCENTADO)
+# --------------------------
+
+with st.sidebar:
+    painel_relatorio(
+        "Baixar relatório em Word",
+        chave_relatorio("dashboard_word", "banco.db", versao, VERSAO_MODELO_RELATORIO),
+        ".docx",
+        "relatorio_metas.docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        gerar_relatorio_word_graficos_modelo,
+        modelo
+    )
+
 # ---------------------------------------------
 # METAS DETALHADAS GERAIS
 # ---------------------------------------------
@@ -734,9 +445,14 @@ if "execucao2" in df.columns:
 
     total_temporal = len(df)
 
+    por_execucao2 = (
+        contar(resumo, cubo, filtros_sel, ["execucao2"])
+        .set_index("execucao2")["Quantidade"]
+    )
+
     dados_exec2 = []
     for s in situacoes_exec2:
-        qtd = df[df["execucao2"] == s].shape[0]
+        qtd = int(por_execucao2.get(s, 0))
         perc = (qtd / total_temporal * 100) if total_temporal else 0
         dados_exec2.append([s, qtd, round(perc, 1)])
 
@@ -762,13 +478,10 @@ if "execucao2" in df.columns:
 
 
 
-if "execucao2" in df.columns:
+# usada no gráfico e na tabela de situação temporal abaixo
+tabela_exec2 = contar(resumo, cubo, filtros_sel, ["Resp_1", "execucao2"])
 
-    tabela_exec2 = (
-        df.groupby(["Resp_1", "execucao2"])
-        .size()
-        .reset_index(name="Quantidade")
-    )
+if "execucao2" in df.columns:
 
     altura2 = max(200, 25 * tabela_exec2["Resp_1"].nunique())
 
@@ -810,9 +523,4 @@ st.divider()
 st.subheader("Situação Temporal por Responsável")
 
 if "execucao2" in df.columns:
-    tabela_exec2 = (
-        df.groupby(["Resp_1", "execucao2"])
-        .size()
-        .reset_index(name="Quantidade")
-    )
-    st.dataframe(tabela_exec2, us
\ No newline at end of file
+    st.dataframe(tabela_exec2, use_container_width=True)
@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import streamlit as st
+
+from cache_relatorios import guardar_relatorio, ler_relatorio, relatorio_em_cache
+
+# =====================================================
+# FILA DE RELATÓRIOS EM SEGUNDO PLANO
+# =====================================================
+# A geração do .docx/.xlsx roda num pool de processos, fora da thread
+# do script do Streamlit. A interface só enfileira o pedido e acompanha
+# o andamento; o resultado vai para o cache em disco (cache_relatorios.py).
+
+MAX_PROCESSOS = int(os.environ.get("PDI_RELATORIOS_PROCESSOS", "2"))
+
+# pedidos do processo inteiro, por chave: duas sessões que pedem o mesmo
+# relatório acompanham o mesmo trabalho
+_trabalhos = {}
+_trabalhos_lock = threading.Lock()
+
+
+def _aguardar(segundos):
+    time.sleep(segundos)
+
+
+@st.cache_resource
+def get_pool():
+
+    # "spawn": o processo do Streamlit tem várias threads, fork não é seguro
+    pool = ProcessPoolExecutor(
+        max_workers=MAX_PROCESSOS,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+    # O Streamlit executa o script do painel como "__main__", e o "spawn"
+    # reexecuta o "__main__" em cada processo novo. Por isso todos os
+    # processos são criados agora, de uma vez, com um "__main__" vazio.
+    principal = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        iniciados = [pool.submit(_aguardar, 0.2) for _ in range(MAX_PROCESSOS)]
+    finally:
+        sys.modules["__main__"] = principal
+
+    for trabalho in iniciados:
+        trabalho.result()
+
+    return pool
+
+
+def enviar_relatorio(chave, extensao, funcao, *args, **kwargs):
+
+    with _trabalhos_lock:
+
+        # descarta pedidos já concluídos (o resultado está no cache em disco)
+        for k in [k for k, t in _trabalhos.items() if t.done()]:
+            del _trabalhos[k]
+
+        if chave not in _trabalhos:
+            gerar = partial(funcao, *args, **kwargs)
+
+            # roda no processo do pool: gera e grava no cache em disco;
+            # só o caminho do arquivo volta para cá
+            try:
+                _trabalhos[chave] = get_pool().submit(guardar_relatorio, chave, extensao, gerar)
+            except BrokenProcessPool:
+                # um processo morreu (ex.: falta de memória): recria o pool
+                get_pool.clear()
+                _trabalhos[chave] = get_pool().submit(guardar_relatorio, chave, extensao, gerar)
+
+        return _trabalhos[chave]
+
+
+def situacao_fila():
+    with _trabalhos_lock:
+        pendentes = [t for t in _trabalhos.values() if not t.done()]
+    return {
+        "gerando": sum(t.running() for t in pendentes),
+        "na_fila": sum(not t.running() for t in pendentes),
+        "limite": MAX_PROCESSOS
+    }
+
+
+def painel_relatorio(rotulo, chave, extensao, nome_arquivo, mime, funcao, *args, **kwargs):
+
+    # 1️⃣ Já gerado: botão de download direto do cache em disco
+    if relatorio_em_cache(chave, extensao):
+        st.download_button(
+            label=rotulo,
+            data=lambda: ler_relatorio(chave, extensao),
+            file_name=nome_arquivo,
+            mime=mime,
+            on_click="ignore",
+            key=f"baixar_{chave}"
+        )
+        return
+
+    with _trabalhos_lock:
+        trabalho = _trabalhos.get(chave)
+
+    # 2️⃣ Ainda não pedido: só entra na fila quando o usuário pede
+    if trabalho is None:
+        if not st.button(f"Preparar: {rotulo}", key=f"preparar_{chave}"):
+            return
+        trabalho = enviar_relatorio(chave, extensao, funcao, *args, **kwargs)
+
+    # 3️⃣ Terminou com erro, ou o arquivo já foi descartado do cache
+    if trabalho.done():
+        with _trabalhos_lock:
+            _trabalhos.pop(chave, None)
+
+        if trabalho.exception() is not None:
+            st.error(f"Falha ao gerar o relatório: {trabalho.exception()}")
+        else:
+            st.rerun()
+        return
+
+    # 4️⃣ Em andamento
+    _acompanhar_relatorio(chave)
+
+
+@st.fragment(run_every=1)
+def _acompanhar_relatorio(chave):
+
+    # roda sozinho a cada segundo, sem reexecutar o painel inteiro
+    with _trabalhos_lock:
+        trabalho = _trabalhos.get(chave)
+
+    if trabalho is None or trabalho.done():
+        st.rerun()
+
+    fila = situacao_fila()
+    if trabalho.running():
+        st.caption(f"⏳ Gerando ({fila['gerando']} de {fila['limite']} em uso)...")
+    else:
+        st.caption(f"🕒 Na fila ({fila['na_fila']} aguardando)...")
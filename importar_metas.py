@@ -1,19 +1,603 @@
-import sqlite3
+import io
+import sys
+from itertools import zip_longest
+
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+from sqlalchemy import String, inspect, text
+
+from banco import (
+    criar_view_metas_temporal,
+    garantir_coluna_execucao2,
+    garantir_resumo_metas,
+    incrementar_versao_dados,
+    reativar_gatilhos_resumo,
+    suspender_gatilhos_resumo
+)
+from classificacao import classificar_execucao2_vetorizado, sql_execucao2
+from conexao import criar_engine
+from migracoes import aplicar_migracoes
+
+# =====================================================
+# IMPORTAÇÃO DA PLANILHA (basegeral.xlsx -> metas)
+# =====================================================
+# Uso:
+#     python importar_metas.py [URL do banco] [--substituir | --lote]
+#
+# Por padrão a importação é incremental: compara a planilha com a
+# tabela metas pela "Ordem", insere as metas novas e atualiza só as
+# colunas de planejamento que mudaram. As colunas de andamento, que os
+# responsáveis preenchem em app.py/app2.py, não são tocadas nas metas
+# que já existem. Metas que saíram da planilha continuam no banco.
+#
+# --substituir recria a tabela a partir da planilha (como a primeira
+# importação), e o andamento registrado se perde.
+#
+# --lote faz a mesma importação incremental dentro do banco: a planilha
+# vai para uma tabela temporária e um único INSERT ... ON CONFLICT junta
+# com metas (ver importar_em_lote). É o padrão no Postgres, onde a tabela
+# temporária é carregada por COPY.
+
+URL_PADRAO = "sqlite:///banco.db"
+ARQUIVO_PLANILHA = "basegeral.xlsx"
+ARQUIVO_REJEITADAS = "importacao_rejeitadas.csv"
+
+# preenchidas pelos responsáveis (e execucao2, calculada a partir delas)
+COLUNAS_ANDAMENTO = ["execucao", "Ano_Conclusao", "execucao2"]
+
+# =====================================================
+# LEITURA DA PLANILHA (ESQUEMA DECLARADO)
+# =====================================================
+# A planilha é lida em streaming (openpyxl read_only, só os valores) e
+# cada coluna é convertida de uma vez para o tipo declarado abaixo, em
+# vez de o pandas adivinhar o tipo célula a célula ("Meta" 1.1 virava
+# REAL, os anos precisavam de inteiro_seguro). Linhas com algum valor que
+# não cabe no tipo da coluna não entram no banco: vão para o relatório de
+# rejeitadas. Colunas fora do esquema passam como vieram.
+
+# cabeçalhos da planilha com os nomes usados pelo banco (view
+# metas_temporal, gatilhos do resumo_metas, app.py)
+NOMES_PLANILHA = {"Início": "Inicio", "Responsáveis": "Responsaveis"}
+
+ESQUEMA_PLANILHA = {
+    "Ordem": "inteiro",
+    "Eixo": "texto",
+    "OEST": "texto",
+    "Objetivo Estratégico": "texto",
+    "OESP": "inteiro",
+    "Objetivo Específico": "texto",
+    "Meta": "texto",
+    "Descrição da Meta": "texto",
+    "Status": "inteiro",
+    "Inicio": "ano",
+    "Fim": "ano",
+    "Ano_Conclusao": "ano",
+    "Responsaveis": "texto",
+    "Quantidade": "inteiro",
+    **{f"Resp_{i}": "texto" for i in range(1, 8)},
+    "Situacao": "decimal",
+    "execucao": "texto"
+}
+
+ANOS_VALIDOS = (1900, 2100)
+
+# tipo de cada coluna do esquema quando ela é criada no banco
+TIPOS_SQL = {"texto": "TEXT", "inteiro": "BIGINT", "ano": "BIGINT", "decimal": "DOUBLE PRECISION"}
+
+# linhas por comando COPY (o CSV de cada lote fica em memória)
+LOTE_COPY = 100_000
+
+# espaços tirados das pontas do texto ao comparar planilha e banco (os
+# mesmos no Python e no SQL: espaço, \t, \n, \v, \f e \r)
+ESPACOS = " \t\n\r\x0b\x0c"
+
+
+def _coluna_texto(valores):
+    # rótulo sem espaços nas pontas; vazio vira nulo
+    texto = pd.Series(valores, dtype=object).astype("string").str.strip()
+    return texto.mask(texto == "")
+
+
+def _converter_coluna(valores, tipo):
+
+    # devolve (coluna convertida, máscara das células inválidas)
+    texto = _coluna_texto(valores)
+
+    if tipo == "texto":
+        return texto, np.zeros(len(texto), dtype=bool)
+
+    numero = pd.to_numeric(texto, errors="coerce").astype("Float64")
+    invalido = texto.notna() & numero.isna()
+
+    if tipo == "decimal":
+        return numero, invalido.to_numpy(dtype=bool)
+
+    invalido |= (numero % 1 != 0).fillna(False)
+    if tipo == "ano":
+        invalido |= (~numero.between(*ANOS_VALIDOS)).fillna(False)
+
+    invalido = invalido.to_numpy(dtype=bool)
+    return numero.mask(invalido).astype("Int64"), invalido
+
+
+def ler_planilha(caminho=ARQUIVO_PLANILHA):
+
+    # 1️⃣ Valores brutos, coluna a coluna (sem DataFrame intermediário)
+    workbook = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [
+            NOMES_PLANILHA.get(str(nome).strip(), str(nome).strip()) if nome is not None else None
+            for nome in next(linhas, ())
+        ]
+        # linhas totalmente vazias (comuns no fim da planilha) não contam;
+        # zip_longest porque linhas sem as últimas células vêm mais curtas
+        colunas = list(zip_longest(
+            *(linha for linha in linhas if any(v is not None for v in linha))
+        ))
+    finally:
+        workbook.close()
+
+    if "Ordem" not in cabecalho:
+        raise ValueError('a planilha não tem a coluna "Ordem"')
+
+    colunas = colunas or [()] * len(cabecalho)
+
+    # 2️⃣ Cada coluna do esquema convertida de uma vez
+    dados = {}
+    invalidas = {}
+    for nome, valores in zip(cabecalho, colunas):
+        if nome is None:
+            continue
+        if nome in ESQUEMA_PLANILHA:
+            dados[nome], invalido = _converter_coluna(valores, ESQUEMA_PLANILHA[nome])
+            if invalido.any():
+                invalidas[nome] = (invalido, valores)
+        else:
+            dados[nome] = pd.Series(valores, dtype=object)
+
+    df = pd.DataFrame(dados)
+
+    # garantir que exista a coluna de execução
+    if "execucao" not in df.columns:
+        df["execucao"] = ""
+
+    # 3️⃣ Rejeitadas: valor que não cabe no tipo, ou "Ordem" vazia ou
+    # repetida (ela identifica a meta entre uma importação e outra)
+    motivos = [[] for _ in range(len(df))]
+
+    for nome, (invalido, valores) in invalidas.items():
+        for i in np.flatnonzero(invalido):
+            motivos[i].append(f"{nome}: valor inválido {valores[i]!r}")
+
+    ordem_bruta = colunas[cabecalho.index("Ordem")]
+    ordem = df["Ordem"]
+
+    for i in np.flatnonzero(_coluna_texto(ordem_bruta).isna().to_numpy(dtype=bool)):
+        motivos[i].append("Ordem vazia")
+    for i in np.flatnonzero((ordem.notna() & ordem.duplicated(keep=False)).to_numpy(dtype=bool)):
+        motivos[i].append("Ordem repetida")
+
+    rejeitar = np.array([bool(m) for m in motivos], dtype=bool)
+    posicoes = np.flatnonzero(rejeitar)
+
+    rejeitadas = pd.DataFrame({
+        # número da linha no Excel (cabeçalho na linha 1)
+        "linha": posicoes + 2,
+        "Ordem": pd.Series([ordem_bruta[i] for i in posicoes], dtype=object),
+        "motivo": ["; ".join(motivos[i]) for i in posicoes]
+    })
+
+    df = df[~rejeitar].reset_index(drop=True)
+    # sem nulos depois das rejeitadas: mesmo tipo da "Ordem" lida do banco
+    df["Ordem"] = df["Ordem"].astype("int64")
+
+    return df, rejeitadas
+
+
+def _valores(serie):
+    # lista de valores Python para o executemany, com nulo como None
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _lista_colunas(colunas):
+    return ", ".join(f'"{c}"' for c in colunas)
+
+
+def _sem_vazio(serie):
+
+    # texto como ler_planilha o deixa: sem espaços nas pontas e vazio como
+    # nulo (o banco.db guarda '' e "texto\t" da importação antiga)
+    texto = serie.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    if not texto.any():
+        return serie
+
+    serie = serie.astype(object)
+    aparado = serie[texto].str.strip(ESPACOS)
+    serie[texto] = aparado.where(aparado != "", None)
+    return serie
+
+
+def _mesmo_valor(planilha, banco):
+
+    # igualdade célula a célula, com nulo igual a nulo; o SQLite guarda o
+    # valor conforme a afinidade da coluna (2 numa coluna TEXT volta "2"),
+    # então número e texto numérico comparam como número
+    planilha, banco = _sem_vazio(planilha), _sem_vazio(banco)
+    numerica = pd.api.types.is_numeric_dtype
+    valores = [planilha, banco]
+
+    if numerica(planilha) != numerica(banco):
+        valores = [pd.to_numeric(s, errors="coerce") for s in valores]
+
+    # (com tipos nullable, comparar com nulo dá NA: conta como diferente)
+    igual = (valores[0] == valores[1]).fillna(False).astype(bool)
+    return igual | (planilha.isna() & banco.isna())
+
+
+def _execucao2(df):
+    # mesma classificação de banco.recalcular_execucao2, só destas linhas
+    colunas = ["execucao", "Inicio", "Fim", "Ano_Conclusao"]
+    return classificar_execucao2_vetorizado(df.reindex(columns=colunas)).astype(object)
+
+
+def _recriar_view(conn):
+
+    # a view metas_temporal lista as colunas de metas de quando foi criada
+    # (ver banco.criar_view_metas_temporal): volta com as colunas atuais
+    conn.execute(text("DROP VIEW IF EXISTS metas_temporal"))
+    criar_view_metas_temporal(conn)
+
+
+def _garantir_colunas(conn, df):
+
+    # colunas novas na planilha entram na tabela (com o tipo do esquema:
+    # o Postgres não aceita coluna sem tipo)
+    existentes = [c["name"] for c in inspect(conn).get_columns("metas")]
+    novas = [c for c in df.columns if c not in existentes]
+
+    for coluna in novas:
+        tipo = TIPOS_SQL.get(ESQUEMA_PLANILHA.get(coluna), "TEXT")
+        conn.execute(text(f'ALTER TABLE metas ADD COLUMN "{coluna}" {tipo}'))
+
+    if novas:
+        _recriar_view(conn)
+
+
+def importar_substituindo(engine, df):
+
+    # a planilha não traz execucao2: sem a coluna, app.py/app2.py não
+    # conseguem salvar, e a virada de ano pode já estar registrada em
+    # controle. Classificada aqui, antes de gravar (mesma regra de
+    # banco.recalcular_execucao2, sem um UPDATE por meta)
+    df = df.assign(execucao2=_execucao2(df))
+
+    with engine.begin() as conn:
+
+        # a view metas_temporal sai e volta na mesma transação, com as
+        # colunas da planilha nova (o Postgres não apaga a tabela com a
+        # view em cima; no SQLite ela apontaria para colunas que sumiram)
+        conn.execute(text("DROP VIEW IF EXISTS metas_temporal"))
+
+        # gravar no banco
+        df.to_sql("metas", conn, if_exists="replace", index=False)
+
+        criar_view_metas_temporal(conn)
+
+        # avisar os painéis que os dados mudaram
+        incrementar_versao_dados(conn)
+
+        # a tabela metas foi recriada sem os gatilhos do resumo_metas:
+        # recria os gatilhos e reconstrói o resumo (ver banco.py)
+        garantir_resumo_metas(conn)
+
+    # e sem a chave e os índices: reaplica as migrações (ver migracoes.py)
+    aplicar_migracoes(engine, todas=True)
+
+    return {"inseridas": len(df), "atualizadas": 0, "inalteradas": 0, "so_no_banco": 0, "colunas": {}}
+
+
+def importar_incremental(engine, df):
+
+    if not inspect(engine).has_table("metas"):
+        return importar_substituindo(engine, df)
+
+    # chave em "Ordem" e índices antes de tudo: cada UPDATE abaixo
+    # localiza a meta pelo índice (ver migracoes.py)
+    aplicar_migracoes(engine, todas=True)
+
+    planejamento = [c for c in df.columns if c != "Ordem" and c not in COLUNAS_ANDAMENTO]
+
+    with engine.begin() as conn:
+
+        # gatilhos do resumo_metas ativos antes de gravar (ver banco.py)
+        garantir_resumo_metas(conn)
+        garantir_coluna_execucao2(conn)
+
+        # 1️⃣ Colunas novas na planilha entram na tabela
+        _garantir_colunas(conn, df)
+
+        # 2️⃣ Metas atuais, alinhadas à planilha pela "Ordem"
+        banco = pd.read_sql(
+            text(f'SELECT "Ordem", {_lista_colunas(planejamento + COLUNAS_ANDAMENTO)} FROM metas'),
+            conn
+        ).set_index("Ordem")
+        planilha = df.set_index("Ordem")
+
+        novas = planilha.index.difference(banco.index)
+        comuns = planilha.index.intersection(banco.index)
+        so_no_banco = banco.index.difference(planilha.index)
+
+        # 3️⃣ Metas novas: todas as colunas da planilha (andamento inclusive)
+        if len(novas):
+            linhas = df[df["Ordem"].isin(novas)]
+            linhas = linhas.assign(execucao2=_execucao2(linhas))
+            colunas = list(linhas.columns)
+            conn.execute(
+                text(
+                    f"INSERT INTO metas ({_lista_colunas(colunas)}) "
+                    f"VALUES ({', '.join(f':c{i}' for i in range(len(colunas)))})"
+                ),
+                [
+                    {f"c{i}": valor for i, valor in enumerate(linha)}
+                    for linha in zip(*(_valores(linhas[c]) for c in colunas))
+                ]
+            )
+
+        # 4️⃣ Metas existentes: só as células de planejamento que mudaram,
+        # um executemany por coluna
+        atualizadas = pd.Index([])
+        por_coluna = {}
+
+        for coluna in planejamento:
+            valores = planilha.loc[comuns, coluna]
+            mudou = ~_mesmo_valor(valores, banco.loc[comuns, coluna])
+
+            if not mudou.any():
+                continue
+
+            conn.execute(
+                text(f'UPDATE metas SET "{coluna}" = :valor WHERE "Ordem" = :ordem'),
+                [
+                    {"valor": valor, "ordem": ordem}
+                    for ordem, valor in zip(valores.index[mudou].tolist(), _valores(valores[mudou]))
+                ]
+            )
+            por_coluna[coluna] = int(mudou.sum())
+            atualizadas = atualizadas.union(valores.index[mudou])
+
+        # 5️⃣ execucao2 das metas que mudaram de prazo, com o andamento
+        # registrado; só as que mudaram de classificação são gravadas
+        if "Inicio" in por_coluna or "Fim" in por_coluna:
+            prazos = banco.loc[atualizadas, ["execucao", "Ano_Conclusao", "execucao2"]].assign(
+                Inicio=planilha.loc[atualizadas, "Inicio"],
+                Fim=planilha.loc[atualizadas, "Fim"]
+            )
+            novo_execucao2 = _execucao2(prazos)
+            mudou = novo_execucao2 != prazos["execucao2"]
+
+            if mudou.any():
+                conn.execute(
+                    text('UPDATE metas SET execucao2 = :execucao2 WHERE "Ordem" = :ordem'),
+                    [
+                        {"execucao2": execucao2, "ordem": ordem}
+                        for ordem, execucao2 in zip(
+                            prazos.index[mudou].tolist(), novo_execucao2[mudou].tolist()
+                        )
+                    ]
+                )
+
+        if len(novas) or len(atualizadas):
+            incrementar_versao_dados(conn)
+
+    return {
+        "inseridas": len(novas),
+        "atualizadas": len(atualizadas),
+        "inalteradas": len(comuns) - len(atualizadas),
+        "so_no_banco": len(so_no_banco),
+        "colunas": por_coluna
+    }
+
+
+# =====================================================
+# IMPORTAÇÃO EM LOTE (TABELA TEMPORÁRIA + UM ÚNICO MERGE)
+# =====================================================
+# Em vez de comparar a planilha com metas no Python, as linhas vão
+# inteiras para a tabela temporária metas_importacao (no Postgres por
+# COPY ... FROM STDIN, no SQLite por executemany) e um único
+# INSERT ... SELECT ... ON CONFLICT ("Ordem") junta as duas tabelas:
+# metas novas entram com todas as colunas, as existentes recebem só as
+# colunas de planejamento, e só quando alguma delas mudou. O resultado é
+# o mesmo de importar_incremental.
+
+def _criar_tabela_preparo(conn):
+
+    # mesmas colunas (e tipos) de metas, sem chave nem gatilhos
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("CREATE TEMP TABLE metas_importacao (LIKE metas) ON COMMIT DROP"))
+        return
+
+    # o SQLite não tem ON COMMIT DROP: a tabela é apagada no fim da importação
+    conn.execute(text("DROP TABLE IF EXISTS temp.metas_importacao"))
+    conn.execute(text("CREATE TEMP TABLE metas_importacao AS SELECT * FROM metas WHERE 0"))
+
+
+def _carregar_tabela_preparo(conn, df):
+
+    colunas = list(df.columns)
+
+    if conn.dialect.name == "postgresql":
+        # COPY em CSV pela conexão do psycopg2 (a mesma transação); nulo
+        # como \N, para o texto vazio continuar texto vazio
+        comando = (
+            f"COPY metas_importacao ({_lista_colunas(colunas)}) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+        cursor = conn.connection.cursor()
+        try:
+            for inicio in range(0, len(df), LOTE_COPY):
+                buffer = io.StringIO()
+                df.iloc[inicio:inicio + LOTE_COPY].to_csv(
+                    buffer, index=False, header=False, na_rep="\\N"
+                )
+                buffer.seek(0)
+                cursor.copy_expert(comando, buffer)
+        finally:
+            cursor.close()
+
+        # o autovacuum não analisa tabelas temporárias: sem estatísticas, o
+        # planejador estima 200 linhas e junta com metas linha a linha
+        conn.execute(text("ANALYZE metas_importacao"))
+        return
+
+    # SQLite: executemany direto no sqlite3, com tuplas (sem montar um
+    # dicionário de parâmetros por linha)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.executemany(
+            f"INSERT INTO metas_importacao ({_lista_colunas(colunas)}) "
+            f"VALUES ({', '.join('?' * len(colunas))})",
+            zip(*(_valores(df[c]) for c in colunas))
+        )
+    finally:
+        cursor.close()
+
+
+def _sql_sem_vazio(coluna, dialeto, texto):
+
+    # mesma normalização de _sem_vazio; no SQLite pelo tipo de cada valor,
+    # no Postgres só nas colunas de texto (NULLIF(inteiro, '') é erro)
+    if dialeto == "sqlite":
+        aparado = f"TRIM({coluna}, ' ' || char(9, 10, 11, 12, 13))"
+        return f"CASE WHEN typeof({coluna}) = 'text' THEN NULLIF({aparado}, '') ELSE {coluna} END"
+
+    if not texto:
+        return coluna
+
+    return f"NULLIF(BTRIM({coluna}, ' ' || CHR(9) || CHR(10) || CHR(11) || CHR(12) || CHR(13)), '')"
+
+
+def importar_em_lote(engine, df):
+
+    # tabela nova: só a estrutura, as linhas entram pelo merge abaixo
+    if not inspect(engine).has_table("metas"):
+        with engine.begin() as conn:
+            df.head(0).to_sql("metas", conn, index=False)
+
+    # a chave em "Ordem" é o alvo do ON CONFLICT (ver migracoes.py)
+    aplicar_migracoes(engine, todas=True)
+
+    dialeto = engine.dialect.name
+    # execucao2 é calculada no merge, não vem da planilha
+    df = df.drop(columns="execucao2", errors="ignore")
+    colunas = list(df.columns)
+    planejamento = [c for c in colunas if c != "Ordem" and c not in COLUNAS_ANDAMENTO]
+    diferente = "IS DISTINCT FROM" if dialeto == "postgresql" else "IS NOT"
+
+    with engine.begin() as conn:
+
+        # o merge de uma planilha grande passa do limite de cada comando
+        # dos painéis (ver conexao.py): sem limite só nesta transação
+        if dialeto == "postgresql":
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+
+        # resumo_metas: gatilhos desligados durante o merge e resumo
+        # reconstruído no fim, numa consulta só (ver banco.py)
+        garantir_resumo_metas(conn)
+        suspender_gatilhos_resumo(conn)
+        garantir_coluna_execucao2(conn)
+        _garantir_colunas(conn, df)
+
+        # 1️⃣ Planilha inteira na tabela temporária
+        _criar_tabela_preparo(conn)
+        _carregar_tabela_preparo(conn, df)
+
+        # 2️⃣ Contagens antes do merge (pela chave de metas: a tabela
+        # temporária não tem índice)
+        total, novas = conn.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM metas),
+                (SELECT COUNT(*) FROM metas_importacao i
+                 WHERE NOT EXISTS (SELECT 1 FROM metas m WHERE m."Ordem" = i."Ordem"))
+        """)).one()
+        so_no_banco = total - (len(df) - novas)
+
+        # 3️⃣ Merge: um único comando para as novas e as alteradas ('' e
+        # texto com espaços nas pontas comparam como em importar_incremental)
+        texto = {
+            c["name"] for c in inspect(conn).get_columns("metas")
+            if isinstance(c["type"], String)
+        }
+        mudou = []
+        for c in planejamento:
+            antes = _sql_sem_vazio(f'metas."{c}"', dialeto, c in texto)
+            depois = _sql_sem_vazio(f'excluded."{c}"', dialeto, c in texto)
+            mudou.append(f"{antes} {diferente} {depois}")
+
+        if planejamento:
+            atualizar = f"""DO UPDATE SET {", ".join(f'"{c}" = excluded."{c}"' for c in planejamento)}
+                WHERE {" OR ".join(mudou)}"""
+        else:
+            atualizar = "DO NOTHING"
+
+        # (as novas já entram com execucao2; WHERE 1 = 1: sem ele o SQLite
+        # lê o ON CONFLICT como parte do SELECT)
+        execucao2 = sql_execucao2(dialeto)
+        gravadas = conn.execute(text(f"""
+            INSERT INTO metas ({_lista_colunas(colunas)}, execucao2)
+            SELECT {_lista_colunas(colunas)}, {execucao2} FROM metas_importacao
+            WHERE 1 = 1
+            ON CONFLICT ("Ordem") {atualizar}
+        """)).rowcount
+
+        # 4️⃣ execucao2 das metas existentes que mudaram de prazo, com o
+        # andamento registrado; só as que mudaram de classificação são gravadas
+        conn.execute(text(f"""
+            UPDATE metas SET execucao2 = {execucao2}
+            WHERE "Ordem" IN (SELECT "Ordem" FROM metas_importacao)
+              AND execucao2 {diferente} ({execucao2})
+        """))
+
+        reativar_gatilhos_resumo(conn, reconstruir=gravadas > 0)
+
+        if dialeto == "sqlite":
+            conn.execute(text("DROP TABLE temp.metas_importacao"))
+
+        if gravadas:
+            incrementar_versao_dados(conn)
+
+    return {
+        "inseridas": novas,
+        "atualizadas": gravadas - novas,
+        "inalteradas": len(df) - gravadas,
+        "so_no_banco": so_no_banco,
+        "colunas": {}
+    }
 
-# conectar ao banco já existente
-conn = sqlite3.connect("banco.db")
 
-# ler planilha
-df = pd.read_excel("basegeral.xlsx")
+if __name__ == "__main__":
 
-# garantir que exista a coluna de execução
-if "execucao" not in df.columns:
-    df["execucao"] = ""
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    engine = criar_engine(argumentos[0] if argumentos else URL_PADRAO)
+    df, rejeitadas = ler_planilha()
 
-# gravar no banco
-df.to_sql("metas", conn, if_exists="replace", index=False)
+    if len(rejeitadas):
+        rejeitadas.to_csv(ARQUIVO_REJEITADAS, index=False)
+        print(f"Linhas rejeitadas: {len(rejeitadas)} (ver {ARQUIVO_REJEITADAS})")
+        for _, linha in rejeitadas.head(5).iterrows():
+            print(f"    linha {linha['linha']}: {linha['motivo']}")
 
-conn.close()
+    if "--substituir" in sys.argv:
+        resumo = importar_substituindo(engine, df)
+    elif "--lote" in sys.argv or engine.dialect.name == "postgresql":
+        resumo = importar_em_lote(engine, df)
+    else:
+        resumo = importar_incremental(engine, df)
 
-print("Tabela metas criada com sucesso.")
\ No newline at end of file
+    print(
+        f"Metas inseridas: {resumo['inseridas']} | atualizadas: {resumo['atualizadas']} | "
+        f"inalteradas: {resumo['inalteradas']} | só no banco (mantidas): {resumo['so_no_banco']}"
+    )
+    for coluna, quantidade in resumo["colunas"].items():
+        print(f"    {coluna}: {quantidade}")
@@ -0,0 +1,249 @@
+import sys
+
+from sqlalchemy import inspect, text
+
+from banco import garantir_tabela_controle, gravar_controle, ler_controle
+from conexao import criar_engine
+
+# =====================================================
+# MIGRAÇÕES DO ESQUEMA (CHAVES E ÍNDICES)
+# =====================================================
+# Cada migração é uma função (conn) aplicada uma única vez, em ordem; a
+# versão do esquema fica na tabela controle ("versao_esquema"). Toda
+# migração é idempotente (IF NOT EXISTS): reaplicar é seguro, e é o que
+# importar_metas.py faz antes de cada importação (e depois de recriar a
+# tabela metas, com --substituir).
+#
+# A migração devolve False quando a tabela de que depende ainda não
+# existe (num banco novo, responsaveis): a aplicação para ali, sem gravar
+# a versão, e a migração roda na próxima vez.
+#
+# Uso:
+#     python migracoes.py [URL do banco] [--verificar]
+#
+# --verificar roda EXPLAIN nas consultas de app.py e confere que cada
+# uma usa o índice esperado.
+
+URL_PADRAO = "sqlite:///banco.db"
+
+COLUNAS_RESPONSAVEIS = [f"Resp_{i}" for i in range(1, 8)]
+
+
+def _colunas(conn, tabela):
+    return [c["name"] for c in inspect(conn).get_columns(tabela)]
+
+
+def _chave_ordem(conn):
+
+    # "Ordem" é o identificador da meta em app.py (carregar_metas e
+    # banco.atualizar_situacoes); antes de criar a chave, confere se ela é válida
+    if not inspect(conn).has_table("metas"):
+        return False
+
+    repetidas, nulas = conn.execute(text("""
+        SELECT COUNT(*) - COUNT(DISTINCT "Ordem"), COUNT(*) - COUNT("Ordem")
+        FROM metas
+    """)).one()
+
+    if repetidas or nulas:
+        raise ValueError(
+            f'metas."Ordem" tem {repetidas} valores repetidos e {nulas} nulos: '
+            "corrija a planilha antes de criar a chave"
+        )
+
+    if conn.dialect.name == "sqlite":
+        # O SQLite não tem ALTER TABLE ... ADD PRIMARY KEY: seria preciso
+        # recriar a tabela, e o rename da tabela nova falha por causa da
+        # view metas_temporal. Um índice único dá a mesma garantia e o
+        # mesmo acesso por "Ordem".
+        conn.execute(text(
+            'CREATE UNIQUE INDEX IF NOT EXISTS ux_metas_ordem ON metas ("Ordem")'
+        ))
+        return True
+
+    if not inspect(conn).get_pk_constraint("metas")["constrained_columns"]:
+        conn.execute(text('ALTER TABLE metas ADD PRIMARY KEY ("Ordem")'))
+    return True
+
+
+def _indices_responsaveis(conn):
+
+    # Resp_1 com "Ordem": o WHERE e o ORDER BY de app.carregar_metas saem
+    # do índice, sem ordenação à parte
+    if not inspect(conn).has_table("metas"):
+        return False
+
+    colunas = _colunas(conn, "metas")
+
+    for coluna in COLUNAS_RESPONSAVEIS:
+        if coluna not in colunas:
+            continue
+
+        indexadas = f'"{coluna}", "Ordem"' if coluna == "Resp_1" else f'"{coluna}"'
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_metas_{coluna.lower()} ON metas ({indexadas})"
+        ))
+    return True
+
+
+def _indice_email(conn):
+
+    # num banco novo a tabela responsaveis ainda não existe
+    if not inspect(conn).has_table("responsaveis"):
+        return False
+
+    # mesma expressão de buscar_responsavel_por_email (app.py e app2.py)
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_responsaveis_email
+        ON responsaveis (LOWER(TRIM(email)))
+    """))
+    return True
+
+
+MIGRACOES = [
+    (1, 'chave em metas."Ordem"', _chave_ordem),
+    (2, "índices nos responsáveis das metas", _indices_responsaveis),
+    (3, "índice do e-mail normalizado dos responsáveis", _indice_email),
+]
+
+# =====================================================
+# APLICAÇÃO
+# =====================================================
+
+def versao_esquema(engine):
+    with engine.begin() as conn:
+        garantir_tabela_controle(conn)
+        return ler_controle(conn, "versao_esquema") or 0
+
+
+def aplicar_migracoes(engine, todas=False):
+
+    # aplica as pendentes (ou todas, com todas=True) e devolve as aplicadas;
+    # para na primeira que ainda não pode rodar
+    aplicadas = []
+
+    for versao, descricao, migrar in MIGRACOES:
+        if not todas and versao <= versao_esquema(engine):
+            continue
+
+        # cada migração e a nova versão na mesma transação
+        with engine.begin() as conn:
+            if not migrar(conn):
+                break
+            garantir_tabela_controle(conn)
+            atual = ler_controle(conn, "versao_esquema") or 0
+            gravar_controle(conn, "versao_esquema", max(atual, versao))
+
+        aplicadas.append((versao, descricao))
+
+    return aplicadas
+
+# =====================================================
+# VERIFICAÇÃO (EXPLAIN)
+# =====================================================
+
+# consultas de app.py, com o índice que cada uma deve usar
+CONSULTAS_INDEXADAS = [
+    (
+        "app.carregar_metas",
+        """
+        SELECT "Ordem", "Meta", execucao, "Ano_Conclusao"
+        FROM metas
+        WHERE "Resp_1" = :usuario
+        ORDER BY "Ordem"
+        """,
+        {"usuario": "STI"},
+        "ix_metas_resp_1"
+    ),
+    (
+        "banco.atualizar_situacoes",
+        """
+        UPDATE metas
+        SET execucao = :status
+        WHERE "Ordem" = :id_meta
+        """,
+        {"status": "INICIADA", "id_meta": 1},
+        {"sqlite": "ux_metas_ordem", "postgresql": "metas_pkey"}
+    ),
+    (
+        "app.buscar_responsavel_por_email",
+        """
+        SELECT usuario
+        FROM responsaveis
+        WHERE LOWER(TRIM(email)) = LOWER(TRIM(:email))
+        """,
+        {"email": "alguem@ufape.edu.br"},
+        "ix_responsaveis_email"
+    ),
+]
+
+
+def explicar(conn, consulta, parametros):
+
+    # plano da consulta, uma linha por passo (sem executar a consulta)
+    if conn.dialect.name == "sqlite":
+        linhas = conn.execute(text(f"EXPLAIN QUERY PLAN {consulta}"), parametros)
+        return [linha[-1] for linha in linhas]
+
+    # com tabelas pequenas o Postgres prefere varrer a tabela (ou ler o
+    # índice em bitmap e ordenar depois); sem essas opções, o plano mostra
+    # se o índice serve para a consulta
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+    return [linha[0] for linha in conn.execute(text(f"EXPLAIN {consulta}"), parametros)]
+
+
+def verificar_indices(engine):
+
+    resultado = []
+
+    with engine.connect() as conn:
+        dialeto = conn.dialect.name
+
+        for nome, consulta, parametros, indice in CONSULTAS_INDEXADAS:
+            if isinstance(indice, dict):
+                indice = indice[dialeto]
+
+            plano = explicar(conn, consulta, parametros)
+            usa_indice = any(indice in passo for passo in plano)
+            # ORDER BY resolvido pelo índice, sem ordenação à parte
+            sem_ordenacao = not any(
+                "TEMP B-TREE" in passo or passo.lstrip().startswith("Sort")
+                for passo in plano
+            )
+
+            resultado.append({
+                "consulta": nome,
+                "indice": indice,
+                "ok": usa_indice and sem_ordenacao,
+                "plano": plano
+            })
+
+        conn.rollback()
+
+    return resultado
+
+# =====================================================
+# LINHA DE COMANDO
+# =====================================================
+
+if __name__ == "__main__":
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    engine = criar_engine(argumentos[0] if argumentos else URL_PADRAO)
+
+    for versao, descricao in aplicar_migracoes(engine):
+        print(f"Migração {versao} aplicada: {descricao}")
+
+    print(f"Versão do esquema: {versao_esquema(engine)}")
+
+    if "--verificar" in sys.argv:
+        falhas = 0
+        for item in verificar_indices(engine):
+            situacao = "OK" if item["ok"] else "FALHOU"
+            print(f"[{situacao}] {item['consulta']} ({item['indice']})")
+            for passo in item["plano"]:
+                print(f"    {passo}")
+            falhas += not item["ok"]
+
+        sys.exit(1 if falhas else 0)
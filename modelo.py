@@ -0,0 +1,443 @@
+import numpy as np
+import pandas as pd
+
+# =====================================================
+# MODELO COMPACTO DAS METAS
+# =====================================================
+# Cada coluna de texto vira um vetor de códigos inteiros (int8/int16/int32)
+# mais a lista de valores distintos, guardada uma única vez. Colunas
+# numéricas ficam como estão. Os filtros devolvem vetores de índices, e o
+# DataFrame só é montado no fim, com as linhas e colunas que a página usa.
+#
+# As colunas usadas nos filtros da barra lateral têm também um índice de
+# bitmaps: para cada valor, um bit por meta (np.packbits, 1 byte a cada
+# 8 metas). Qualquer combinação de filtros é um AND desses bitmaps, e os
+# índices das metas saem de uma vez só no fim.
+#
+# O modelo é somente leitura: uma única cópia por versão dos dados é
+# compartilhada por todas as sessões do processo (st.cache_resource).
+# Os vetores são marcados como não graváveis, e materializar() sempre
+# devolve cópias.
+#
+# modelo = {
+#     "linhas": n,
+#     "colunas": {nome: (codigos, tipo) ou array},
+#     "bitmaps": {nome: matriz uint8 (valores x bytes)},
+#     "hierarquia": árvore de montar_hierarquia (opcional)
+# }
+
+
+def _tipo_codigos(quantidade):
+    # menor inteiro com sinal que comporta os códigos (-1 = nulo)
+    for tipo in (np.int8, np.int16, np.int32):
+        if quantidade < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def _somente_leitura(valores):
+    # ndarray, ou os vetores internos dos arrays do pandas
+    # (float64 -> _ndarray; Int16 com nulos -> _data e _mask)
+    for atributo in ("_ndarray", "_data", "_mask"):
+        vetor = getattr(valores, atributo, valores)
+        if isinstance(vetor, np.ndarray):
+            vetor.setflags(write=False)
+    return valores
+
+
+def _montar_bitmaps(codigos, quantidade):
+    # linha k = bits das metas com código k (nulos, -1, ficam sem bit)
+    bitmaps = np.empty((quantidade, (len(codigos) + 7) // 8), dtype=np.uint8)
+    for k in range(quantidade):
+        bitmaps[k] = np.packbits(codigos == k)
+    return bitmaps
+
+
+def montar_modelo(df, colunas_filtro=()):
+
+    colunas = {}
+    bitmaps = {}
+
+    for coluna in df.columns:
+        serie = df[coluna]
+
+        # 1️⃣ Já categórica (ver banco.carregar_metas): aproveita os códigos
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            tipo = serie.dtype
+
+        # 2️⃣ Números: ficam como estão (cópia própria do modelo)
+        elif pd.api.types.is_numeric_dtype(serie.dtype):
+            colunas[coluna] = _somente_leitura(serie.array.copy())
+            continue
+
+        # 3️⃣ Texto: cada valor distinto guardado uma vez
+        else:
+            codigos, valores = pd.factorize(serie, sort=True)
+            tipo = pd.CategoricalDtype(valores)
+
+        codigos = codigos.astype(_tipo_codigos(len(tipo.categories)))
+        colunas[coluna] = (_somente_leitura(codigos), tipo)
+
+        if coluna in colunas_filtro:
+            bitmaps[coluna] = _somente_leitura(
+                _montar_bitmaps(codigos, len(tipo.categories))
+            )
+
+    return {"linhas": len(df), "colunas": colunas, "bitmaps": bitmaps}
+
+# =====================================================
+# FILTROS
+# =====================================================
+
+def _bitmap(modelo, coluna, valor):
+
+    codigos, tipo = modelo["colunas"][coluna]
+    if valor not in tipo.categories:
+        return None
+
+    k = tipo.categories.get_loc(valor)
+    if coluna in modelo["bitmaps"]:
+        return modelo["bitmaps"][coluna][k]
+
+    # coluna sem índice: calcula o bitmap na hora
+    return np.packbits(codigos == k)
+
+
+def mascara_filtros(modelo, filtros):
+
+    # filtros = {coluna: valor}; "Todos" não filtra, como nos painéis.
+    # Devolve o bitmap (np.packbits) das metas que atendem a todos.
+    linhas = modelo["linhas"]
+    mascara = np.packbits(np.ones(linhas, dtype=bool))
+
+    for coluna, valor in filtros.items():
+        if valor == "Todos":
+            continue
+
+        bitmap = _bitmap(modelo, coluna, valor)
+        if bitmap is None:
+            return np.zeros_like(mascara)
+
+        np.bitwise_and(mascara, bitmap, out=mascara)
+
+    return mascara
+
+
+def filtrar(modelo, filtros):
+
+    # índices das metas que atendem a todos os filtros
+    mascara = mascara_filtros(modelo, filtros)
+    return np.flatnonzero(np.unpackbits(mascara, count=modelo["linhas"]))
+
+
+def opcoes(modelo, coluna, mascara=None):
+
+    # valores distintos (não nulos) da coluna, em ordem, para os selectbox;
+    # com mascara, só os que aparecem nas metas marcadas nela
+    codigos, tipo = modelo["colunas"][coluna]
+
+    if coluna in modelo["bitmaps"]:
+        bitmaps = modelo["bitmaps"][coluna]
+        if mascara is not None:
+            bitmaps = bitmaps & mascara
+        presentes = np.flatnonzero(bitmaps.any(axis=1))
+
+    else:
+        if mascara is not None:
+            codigos = codigos[np.unpackbits(mascara, count=modelo["linhas"]).astype(bool)]
+        presentes = np.unique(codigos)
+        presentes = presentes[presentes >= 0]
+
+    return tipo.categories[presentes].tolist()
+
+
+# =====================================================
+# COMBINAÇÕES DE CÓDIGOS
+# =====================================================
+
+def _combinar_codigos(modelo, colunas):
+
+    # uma chave inteira por combinação de códigos (-1 = nulo)
+    chave = np.zeros(modelo["linhas"], dtype=np.int64)
+    for coluna in colunas:
+        codigos, tipo = modelo["colunas"][coluna]
+        chave = chave * (len(tipo.categories) + 1) + (codigos.astype(np.int64) + 1)
+    return chave
+
+
+def _separar_codigos(modelo, colunas, chaves):
+
+    # inverso de _combinar_codigos, para um vetor de chaves
+    codigos = {}
+    for coluna in reversed(colunas):
+        quantidade = len(modelo["colunas"][coluna][1].categories) + 1
+        chaves, resto = np.divmod(chaves, quantidade)
+        codigos[coluna] = resto - 1
+    return {coluna: codigos[coluna] for coluna in colunas}
+
+
+# =====================================================
+# HIERARQUIA (EIXO → OBJETIVO ESTRATÉGICO → ESPECÍFICO)
+# =====================================================
+# Árvore de dicionários simples, com a quantidade de metas em cada nó:
+#
+# {"metas": n, "filhos": {"Todos": {...}, "Ensino": {"metas": n, "filhos": {...}}}}
+#
+# Em cada nível o filho "Todos" soma todos os valores (inclusive metas sem
+# valor naquele nível), como os filtros da barra lateral. As opções de um
+# selectbox são as chaves dos filhos, já em ordem, com "Todos" na frente.
+
+def _somar_caminho(no, caminho, quantidade):
+
+    no["metas"] += quantidade
+    if not caminho:
+        return
+
+    valor, resto = caminho[0], caminho[1:]
+    chaves = ["Todos"] if valor is None else [valor, "Todos"]
+
+    for chave in chaves:
+        filho = no["filhos"].setdefault(chave, {"metas": 0, "filhos": {}})
+        _somar_caminho(filho, resto, quantidade)
+
+
+def _ordenar_hierarquia(no):
+
+    valores = sorted(chave for chave in no["filhos"] if chave != "Todos")
+    chaves = (["Todos"] if "Todos" in no["filhos"] else []) + valores
+
+    return {
+        "metas": no["metas"],
+        "filhos": {chave: _ordenar_hierarquia(no["filhos"][chave]) for chave in chaves}
+    }
+
+
+def montar_hierarquia(modelo, niveis, pesos=None):
+
+    # 1️⃣ Combinações de códigos dos níveis presentes, com a contagem
+    # (pesos: quantas metas cada linha do modelo representa, ver montar_cubo)
+    combinacoes, posicao = np.unique(
+        _combinar_codigos(modelo, niveis), return_inverse=True
+    )
+    quantidades = np.bincount(posicao, weights=pesos).astype(np.int64)
+    codigos = _separar_codigos(modelo, niveis, combinacoes)
+
+    # 2️⃣ Soma cada combinação na árvore (poucas combinações, não metas)
+    raiz = {"metas": 0, "filhos": {}}
+    for i, quantidade in enumerate(quantidades.tolist()):
+        caminho = []
+        for coluna in niveis:
+            codigo = codigos[coluna][i]
+            categorias = modelo["colunas"][coluna][1].categories
+            caminho.append(None if codigo < 0 else categorias[codigo])
+        _somar_caminho(raiz, caminho, quantidade)
+
+    return _ordenar_hierarquia(raiz)
+
+
+def opcoes_hierarquia(hierarquia, *selecao):
+
+    # opções do nível seguinte à seleção, com "Todos" na frente:
+    # opcoes_hierarquia(h) -> eixos; opcoes_hierarquia(h, eixo) -> objetivos...
+    no = hierarquia
+    for valor in selecao:
+        no = no["filhos"][valor]
+
+    return list(no["filhos"])
+
+# =====================================================
+# CUBO DE CONTAGENS
+# =====================================================
+# Quantidade de metas para cada combinação das dimensões, num único
+# ndarray. KPIs, gráficos e tabelas dinâmicas viram fatia + soma no cubo,
+# sem percorrer as metas.
+#
+# Com pesos, cada linha do modelo vale por várias metas: é o caso do
+# modelo montado com as linhas do resumo_metas (banco.carregar_resumo_metas),
+# uma por combinação, com a quantidade de metas.
+#
+# Uma dimensão pode juntar várias colunas (ex.: Eixo + Objetivo Estratégico
+# + Objetivo Específico): o eixo do cubo fica só com as combinações que
+# existem, em vez do produto de todos os valores.
+#
+# cubo = {
+#     "dimensoes": [(coluna, ...), ...],
+#     "codigos": [{coluna: código em cada posição do eixo}, ...],
+#     "contagens": ndarray com um eixo por dimensão
+# }
+
+def montar_cubo(modelo, dimensoes, pesos=None):
+
+    dimensoes = [d if isinstance(d, tuple) else (d,) for d in dimensoes]
+
+    codigos = []
+    posicoes = []
+    forma = []
+    for colunas in dimensoes:
+        combinacoes, posicao = np.unique(
+            _combinar_codigos(modelo, colunas), return_inverse=True
+        )
+        codigos.append(_separar_codigos(modelo, colunas, combinacoes))
+        posicoes.append(posicao)
+        forma.append(len(combinacoes))
+
+    contagens = np.bincount(
+        np.ravel_multi_index(posicoes, forma),
+        weights=pesos,
+        minlength=int(np.prod(forma))
+    ).astype(np.int64).reshape(forma)
+
+    return {
+        "dimensoes": dimensoes,
+        "codigos": [{c: _somente_leitura(v) for c, v in d.items()} for d in codigos],
+        "contagens": _somente_leitura(contagens)
+    }
+
+
+def _reagrupar(contagens, eixo, grupo, quantidade):
+
+    # soma as posições do eixo que caem no mesmo grupo
+    if quantidade == len(grupo) and np.all(grupo == np.arange(quantidade)):
+        return contagens
+
+    ordem = np.argsort(grupo, kind="stable")
+    inicios = np.flatnonzero(np.r_[True, np.diff(grupo[ordem]) != 0])
+    return np.add.reduceat(np.take(contagens, ordem, axis=eixo), inicios, axis=eixo)
+
+
+def contar(modelo, cubo, filtros, por=()):
+
+    # Quantidade de metas que atendem aos filtros ("Todos" não filtra),
+    # agrupada pelas colunas de "por" como um groupby(...).size():
+    # só combinações presentes, sem nulos, na ordem dos valores.
+    # Sem "por", devolve o total (int).
+    contagens = cubo["contagens"]
+
+    # 1️⃣ Fatia: só os eixos com algum filtro são recortados
+    posicoes = []
+    for eixo, codigos in enumerate(cubo["codigos"]):
+        manter = None
+        for coluna, codigos_coluna in codigos.items():
+            valor = filtros.get(coluna, "Todos")
+            if valor == "Todos":
+                continue
+            categorias = modelo["colunas"][coluna][1].categories
+            codigo = categorias.get_loc(valor) if valor in categorias else -2
+            iguais = codigos_coluna == codigo
+            manter = iguais if manter is None else manter & iguais
+
+        if manter is None:
+            posicoes.append(np.arange(contagens.shape[eixo]))
+        else:
+            posicoes.append(np.flatnonzero(manter))
+            contagens = np.take(contagens, posicoes[-1], axis=eixo)
+
+    # 2️⃣ Soma de uma vez os eixos que não têm coluna de "por"
+    usados = [
+        eixo for eixo, codigos in enumerate(cubo["codigos"])
+        if any(coluna in por for coluna in codigos)
+    ]
+    contagens = contagens.sum(
+        axis=tuple(e for e in range(contagens.ndim) if e not in usados)
+    )
+
+    if not por:
+        return int(contagens)
+
+    # 3️⃣ Reagrupa cada eixo restante pelos códigos das colunas pedidas
+    rotulos = {}
+    for eixo, eixo_cubo in enumerate(usados):
+        codigos = cubo["codigos"][eixo_cubo]
+        colunas = [c for c in codigos if c in por]
+
+        chaves = np.zeros(len(posicoes[eixo_cubo]), dtype=np.int64)
+        for coluna in colunas:
+            quantidade = len(modelo["colunas"][coluna][1].categories) + 1
+            chaves = chaves * quantidade + (
+                codigos[coluna][posicoes[eixo_cubo]].astype(np.int64) + 1
+            )
+
+        grupos, grupo = np.unique(chaves, return_inverse=True)
+        contagens = _reagrupar(contagens, eixo, grupo, len(grupos))
+        rotulos[eixo] = _separar_codigos(modelo, colunas, grupos)
+
+    # 4️⃣ Combinações presentes, sem nulos, como linhas
+    presentes = np.nonzero(contagens > 0)
+
+    codigos = {}
+    for eixo, indices in enumerate(presentes):
+        for coluna, codigos_coluna in rotulos[eixo].items():
+            codigos[coluna] = codigos_coluna[indices]
+
+    validas = np.logical_and.reduce([c >= 0 for c in codigos.values()])
+    quantidades = contagens[presentes][validas]
+    codigos = {coluna: c[validas] for coluna, c in codigos.items()}
+
+    ordem = np.lexsort([codigos[coluna] for coluna in reversed(por)])
+
+    tabela = {
+        coluna: modelo["colunas"][coluna][1].categories[codigos[coluna][ordem]]
+        for coluna in por
+    }
+    tabela["Quantidade"] = quantidades[ordem]
+
+    return pd.DataFrame(tabela)
+
+
+# =====================================================
+# DATAFRAME DAS METAS FILTRADAS
+# =====================================================
+
+def materializar(modelo, indices=None, colunas=None):
+
+    # DataFrame só com as linhas pedidas; as colunas de texto saem como
+    # categóricas que compartilham a lista de valores do modelo
+    if indices is None:
+        indices = np.arange(modelo["linhas"])
+
+    if colunas is None:
+        colunas = list(modelo["colunas"])
+
+    dados = {}
+    for coluna in colunas:
+        valor = modelo["colunas"][coluna]
+
+        if isinstance(valor, tuple):
+            codigos, tipo = valor
+            dados[coluna] = pd.Categorical.from_codes(codigos[indices], dtype=tipo)
+        else:
+            dados[coluna] = valor[indices]
+
+    return pd.DataFrame(dados, index=indices)
+
+# =====================================================
+# MEMÓRIA
+# =====================================================
+
+def memoria_modelo(modelo):
+
+    total = sum(bitmaps.nbytes for bitmaps in modelo["bitmaps"].values())
+    for valor in modelo["colunas"].values():
+        if isinstance(valor, tuple):
+            codigos, tipo = valor
+            total += codigos.nbytes + tipo.categories.memory_usage(deep=True)
+        else:
+            total += valor.nbytes
+
+    return total
+
+
+def memoria_df(df):
+
+    # colunas categóricas contam só os códigos: a lista de valores é a do
+    # modelo, compartilhada
+    total = df.index.memory_usage(deep=True)
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            total += serie.cat.codes.nbytes
+        else:
+            total += serie.memory_usage(index=False, deep=True)
+
+    return total
@@ -0,0 +1,714 @@
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from docx import Document
+from docx.shared import Inches
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn, nsdecls
+from datetime import datetime
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from xml.sax.saxutils import escape
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from sqlalchemy import text
+
+from conexao import criar_engine
+from modelo import materializar
+
+# =====================================================
+# RELATÓRIOS (EXCEL E WORD)
+# =====================================================
+# Funções sem Streamlit, para poderem rodar nos processos de
+# fila_relatorios.py: os relatórios Word recebem o DataFrame e devolvem
+# bytes; o Excel lê direto do banco e devolve um arquivo temporário.
+
+# incrementar quando mudar o layout de qualquer relatório abaixo
+# (invalida os arquivos guardados em cache_relatorios.py)
+VERSAO_MODELO_RELATORIO = 1
+
+# --------------------------
+# GERAR EXCEL (STREAMING)
+# --------------------------
+# Lê as metas do banco em lotes (cursor no servidor, no Postgres) e grava
+# linha a linha num workbook "write_only" do openpyxl, que não guarda as
+# células na memória. O arquivo final vai para um SpooledTemporaryFile:
+# fica na memória enquanto é pequeno e passa para o disco depois disso.
+# A memória usada não depende do número de metas.
+
+# expressão SQL de cada filtro; a situação segue a mesma regra dos painéis
+# (vazio ou nulo conta como "NÃO INICIADA")
+_SQL_FILTROS = {
+    "Resp_1": '"Resp_1"',
+    "execucao": "COALESCE(NULLIF(execucao, ''), 'NÃO INICIADA')",
+    "Eixo": '"Eixo"',
+    "Objetivo Estratégico": '"Objetivo Estratégico"',
+    "Objetivo Específico": '"Objetivo Específico"'
+}
+
+LIMITE_EXCEL_MEMORIA = 16 * 1024 * 1024
+
+
+def _cabecalho_excel(planilha, colunas):
+    # mesmo estilo do cabeçalho do pandas.to_excel
+    borda = Side(style="thin")
+    celulas = []
+    for coluna in colunas:
+        celula = WriteOnlyCell(planilha, value=coluna)
+        celula.font = Font(bold=True)
+        celula.border = Border(left=borda, right=borda, top=borda, bottom=borda)
+        celula.alignment = Alignment(horizontal="center", vertical="top")
+        celulas.append(celula)
+    return celulas
+
+
+def gerar_excel(url_banco, filtros=None, tamanho_lote=5000):
+
+    # recebe a URL (e não o engine) para poder ser enviada a outro processo
+    condicoes = []
+    parametros = {}
+    for i, (coluna, valor) in enumerate((filtros or {}).items()):
+        if valor == "Todos":
+            continue
+        condicoes.append(f"{_SQL_FILTROS[coluna]} = :filtro_{i}")
+        parametros[f"filtro_{i}"] = valor
+
+    consulta = "SELECT * FROM metas_temporal"
+    if condicoes:
+        consulta += " WHERE " + " AND ".join(condicoes)
+
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet("Metas")
+
+    # um pool só desta geração (o processo não tem a engine do painel)
+    engine = criar_engine(url_banco, pool_size=1)
+    try:
+        with engine.connect() as conn:
+            resultado = conn.execution_options(stream_results=True).execute(
+                text(consulta), parametros
+            )
+
+            colunas = list(resultado.keys())
+            pos_execucao = colunas.index("execucao")
+            planilha.append(_cabecalho_excel(planilha, colunas))
+
+            for lote in resultado.partitions(tamanho_lote):
+                for linha in lote:
+                    linha = list(linha)
+                    if not linha[pos_execucao]:
+                        linha[pos_execucao] = "NÃO INICIADA"
+                    planilha.append(linha)
+    finally:
+        engine.dispose()
+
+    arquivo = SpooledTemporaryFile(max_size=LIMITE_EXCEL_MEMORIA)
+    workbook.save(arquivo)
+    arquivo.seek(0)
+    return arquivo
+
+# --------------------------
+# TABELAS DO WORD
+# --------------------------
+# Monta a tabela inteira como XML e faz um único parse, em vez de
+# percorrer célula, parágrafo e run pela API do python-docx.
+
+COR_CABECALHO = "D9D9D9"
+COR_ZEBRA = "F2F2F2"
+COR_PERCENTUAL_ALTO = "C6EFCE"
+COR_PERCENTUAL_BAIXO = "FFC7CE"
+
+_SOMBRAS = {
+    cor: f'<w:shd w:val="clear" w:color="auto" w:fill="{cor}"/>'
+    for cor in (COR_CABECALHO, COR_ZEBRA, COR_PERCENTUAL_ALTO, COR_PERCENTUAL_BAIXO)
+}
+_SOMBRAS[None] = ""
+
+
+def _xml_texto(texto):
+    # quebras de linha e tabulações como o cell.text do python-docx faz
+    texto = escape(texto)
+    texto = texto.replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">')
+    texto = texto.replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+    return f'<w:t xml:space="preserve">{texto}</w:t>'
+
+
+def _xml_celula(texto, largura, cor, alinhamento, tamanho, negrito=False):
+    negrito = "<w:b/>" if negrito else ""
+    return (
+        f'<w:tc><w:tcPr><w:tcW w:w="{largura}" w:type="dxa"/>{_SOMBRAS[cor]}</w:tcPr>'
+        f'<w:p><w:pPr><w:jc w:val="{alinhamento}"/></w:pPr>'
+        f'<w:r><w:rPr>{negrito}<w:sz w:val="{tamanho}"/></w:rPr>{_xml_texto(texto)}</w:r>'
+        f'</w:p></w:tc>'
+    )
+
+
+def adicionar_tabela(document, cabecalho, colunas, destacar_percentual=False):
+
+    # cabecalho: títulos; colunas: uma sequência de valores por coluna
+    n_colunas = len(cabecalho)
+    textos = [[str(v) for v in coluna] for coluna in colunas]
+    n_linhas = len(textos[0]) if textos else 0
+
+    tabela = document.add_table(rows=0, cols=n_colunas)
+    tabela.style = "Table Grid"
+    larguras = [int(col.width) // 635 if col.width else 0 for col in tabela.columns]  # EMU -> dxa
+
+    # cor de cada célula do corpo: zebra nas linhas pares e, com
+    # destacar_percentual, verde/vermelho nas duas últimas colunas
+    zebra = [COR_ZEBRA if i % 2 == 0 else None for i in range(n_linhas)]
+    cores = [list(zebra) for _ in range(n_colunas)]
+
+    if destacar_percentual:
+        for j in range(max(0, n_colunas - 2), n_colunas):
+            valores = pd.to_numeric(
+                pd.Series(textos[j], dtype=object).str.replace(",", ".", regex=False),
+                errors="coerce"
+            )
+            cores[j] = [
+                COR_PERCENTUAL_ALTO if alto else COR_PERCENTUAL_BAIXO if baixo else cor
+                for alto, baixo, cor in zip(valores >= 70, valores < 40, cores[j])
+            ]
+
+    partes = [f"<w:tbl {nsdecls('w')}><w:tr>"]
+    partes.extend(
+        _xml_celula(titulo, larguras[j], COR_CABECALHO, "center", 22, negrito=True)
+        for j, titulo in enumerate(cabecalho)
+    )
+    partes.append("</w:tr>")
+
+    for i in range(n_linhas):
+        partes.append("<w:tr>")
+        partes.extend(
+            _xml_celula(
+                textos[j][i],
+                larguras[j],
+                cores[j][i],
+                "left" if j == 0 else "center",
+                20
+            )
+            for j in range(n_colunas)
+        )
+        partes.append("</w:tr>")
+
+    partes.append("</w:tbl>")
+
+    for linha in parse_xml("".join(partes)):
+        tabela._tbl.append(linha)
+
+    return tabela
+
+# --------------------------
+# AGREGAÇÃO DO WORD (PAINEL GERENCIAL)
+# --------------------------
+# Um único groupby sobre as metas (situação x eixo x responsável x
+# objetivo estratégico x concluída) gera uma tabela pequena de contagens;
+# cada seção do relatório é só uma soma sobre essa tabela.
+
+SECOES_RELATORIO = {
+    "eixo": "Eixo",
+    "responsaveis": "Resp_1",
+    "objetivos": "Objetivo Estratégico"
+}
+
+
+def _concluida(execucao):
+
+    # mesmo critério de antes ("conclu" no texto da situação), avaliado
+    # uma vez por categoria quando a coluna já vem codificada
+    if isinstance(execucao.dtype, pd.CategoricalDtype):
+        por_categoria = np.asarray(
+            execucao.cat.categories.astype(str).str.lower()
+            .str.contains("conclu", regex=False), dtype=bool
+        )
+        codigos = execucao.cat.codes.to_numpy()
+        return np.where(codigos >= 0, por_categoria[codigos], False)
+
+    return (
+        execucao.astype(str).str.lower()
+        .str.contains("conclu", regex=False).to_numpy(dtype=bool)
+    )
+
+
+def _texto_sem_espacos(coluna):
+
+    # astype(str).str.strip() feito uma vez por categoria (nulo continua nulo)
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        textos = coluna.cat.categories.astype(str).str.strip()
+        codigos, categorias = pd.factorize(textos, sort=True)
+        originais = coluna.cat.codes.to_numpy()
+        return pd.Categorical.from_codes(
+            np.where(originais >= 0, codigos[originais], -1), categorias
+        )
+
+    return coluna.astype(str).str.strip()
+
+
+def _tabela_status(contagens, chave):
+
+    somas = contagens.groupby(chave)[["Concluída", "Não Concluída"]].sum()
+    concluidas = somas["Concluída"].to_numpy()
+    nao_concluidas = somas["Não Concluída"].to_numpy()
+    total = concluidas + nao_concluidas
+
+    return pd.DataFrame({
+        chave: somas.index,
+        "Concluída": concluidas,
+        "Não Concluída": nao_concluidas,
+        "Total": total,
+        "% Concluída": np.round(concluidas / total * 100, 1),
+        "% Não Concluída": np.round(nao_concluidas / total * 100, 1)
+    })
+
+
+def agregar_relatorio_word(df):
+
+    # 1️⃣ Chaves do groupby e status binário ("conclu" na situação)
+    chaves = {"execucao": df["execucao"]}
+    for coluna in SECOES_RELATORIO.values():
+        if coluna in df.columns:
+            chaves[coluna] = df[coluna]
+    if "Resp_1" in chaves:
+        chaves["Resp_1"] = _texto_sem_espacos(df["Resp_1"])
+
+    concluida = _concluida(df["execucao"])
+    colunas = list(chaves)
+    chaves["Concluída"] = concluida.astype(np.int64)
+    chaves["Não Concluída"] = (~concluida).astype(np.int64)
+
+    # 2️⃣ A única passada sobre as metas: contagens por combinação
+    contagens = (
+        pd.DataFrame(chaves)
+        .groupby(colunas, dropna=False, observed=True)
+        .sum()
+        .reset_index()
+    )
+
+    # 3️⃣ Seções, somando a tabela de contagens
+    por_situacao = contagens.groupby("execucao")[["Concluída", "Não Concluída"]].sum()
+    quantidade = por_situacao.sum(axis=1).to_numpy()
+    total = quantidade.sum()
+    resumo = pd.DataFrame({
+        "execucao": por_situacao.index,
+        "Quantidade": quantidade,
+        "Percentual (%)": np.round(quantidade / total * 100, 1) if total else 0
+    })
+
+    secoes = {"resumo": resumo}
+    for secao, coluna in SECOES_RELATORIO.items():
+        if coluna in chaves:
+            secoes[secao] = _tabela_status(contagens, coluna)
+
+    if "eixo" in secoes:
+        secoes["eixo"] = secoes["eixo"].sort_values("Total", ascending=False)
+
+    return secoes
+
+
+def _tabela_secao(document, titulo_chave, tabela, chave):
+    adicionar_tabela(
+        document,
+        [titulo_chave, "Total", "Concluídas", "Não Concluídas", "% Concluída", "% Não Concluída"],
+        [
+            tabela[chave],
+            tabela["Total"],
+            tabela["Concluída"],
+            tabela["Não Concluída"],
+            tabela["% Concluída"],
+            tabela["% Não Concluída"]
+        ],
+        destacar_percentual=True
+    )
+
+# --------------------------
+# GERAR WORD (PAINEL GERENCIAL)
+# --------------------------
+def gerar_relatorio_word(
+    df,
+    responsavel_sel="Todos",
+    eixo_sel="Todos",
+    situacao_sel="Todos",
+    obj_est_sel="Todos",
+    obj_esp_sel="Todos"
+):
+
+
+    # ==========================
+    # FUNÇÕES AUXILIARES
+    # ==========================
+    def add_page_number(document):
+        section = document.sections[0]
+        footer = section.footer
+        paragraph = footer.paragraphs[0]
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        run = paragraph.add_run()
+        run.text = "Página "
+
+        fldChar1 = OxmlElement('w:fldChar')
+        fldChar1.set(qn('w:fldCharType'), 'begin')
+
+        instrText = OxmlElement('w:instrText')
+        instrText.text = "PAGE"
+
+        fldChar2 = OxmlElement('w:fldChar')
+        fldChar2.set(qn('w:fldCharType'), 'end')
+
+        run._r.append(fldChar1)
+        run._r.append(instrText)
+        run._r.append(fldChar2)
+
+    # ==========================
+    # PREPARAÇÃO (AGREGAÇÃO ÚNICA)
+    # ==========================
+    secoes = agregar_relatorio_word(df)
+
+    document = Document()
+    add_page_number(document)
+
+    # ==========================
+    # RESPONSÁVEL AUTOMÁTICO
+    # ==========================
+    if "responsaveis" in secoes and not df.empty:
+        r = secoes["responsaveis"]["Resp_1"]
+        responsavel_final = r.iloc[0] if len(r) == 1 else "Geral"
+    else:
+        responsavel_final = "Geral"
+
+    # ==========================
+    # CAPA INSTITUCIONAL
+    # ==========================
+    try:
+        document.add_picture("logo_ufape.png", width=Inches(2))
+        document.paragraphs[-1].alignment = WD_ALIGN_PARAGRAPH.CENTER
+    except:
+        pass
+
+    p = document.add_paragraph()
+    p.add_run("\nUNIVERSIDADE FEDERAL DO AGRESTE DE PERNAMBUCO\n").bold = True
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    p = document.add_paragraph()
+    p.add_run("RELATÓRIO GERENCIAL DO PDI\n").bold = True
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    p = document.add_paragraph()
+    p.add_run(f"Responsável: {responsavel_final}\n")
+    p.add_run(f"Data e hora: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    document.add_page_break()
+
+    # ==========================
+    # ESCOPO
+    # ==========================
+    document.add_heading("Escopo do Relatório", 1)
+
+    filtros = {
+        "Responsável": responsavel_final,
+        "Situação": situacao_sel if situacao_sel != "Todos" else "Todas",
+        "Eixo": eixo_sel if eixo_sel != "Todos" else "Todos",
+        "Objetivo Estratégico": obj_est_sel if obj_est_sel != "Todos" else "Todos",
+        "Objetivo Específico": obj_esp_sel if obj_esp_sel != "Todos" else "Todos",
+    }
+
+    for k, v in filtros.items():
+        p = document.add_paragraph()
+        p.add_run(f"{k}: ").bold = True
+        p.add_run(str(v))
+
+    # ==========================
+    # 1. RESUMO GERAL
+    # ==========================
+    document.add_heading("1. Resumo Geral", 1)
+
+    resumo = secoes["resumo"]
+
+    adicionar_tabela(
+        document,
+        ["Situação", "Quantidade", "Percentual (%)"],
+        [resumo["execucao"], resumo["Quantidade"], resumo["Percentual (%)"]],
+        destacar_percentual=True
+    )
+
+    # ==========================
+    # 2. EXECUÇÃO POR EIXO (COMPLETO)
+    # ==========================
+    if "eixo" in secoes:
+
+        document.add_page_break()
+        document.add_heading("2. Execução por Eixo", 1)
+
+        _tabela_secao(document, "Eixo", secoes["eixo"], "Eixo")
+
+    # ==========================
+    # 3. RESPONSÁVEIS
+    # ==========================
+    if "responsaveis" in secoes:
+
+        document.add_page_break()
+        document.add_heading("3. Ranking de Responsáveis", 1)
+
+        _tabela_secao(document, "Responsável", secoes["responsaveis"], "Resp_1")
+
+    # ==========================
+    # 4. OBJETIVO ESTRATÉGICO
+    # ==========================
+    if "objetivos" in secoes:
+
+        document.add_page_break()
+        document.add_heading("4. Análise por Objetivo Estratégico", 1)
+
+        _tabela_secao(
+            document, "Objetivo Estratégico", secoes["objetivos"], "Objetivo Estratégico"
+        )
+
+    # ==========================
+    # FINAL (OBRIGATÓRIO)
+    # ==========================
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+# --------------------------
+# GERAR WORD COM GRÁFICOS (dashboard.py) com texto automático
+# --------------------------
+def gerar_texto_relatorio(df):
+
+    total = len(df)
+
+    resumo = (
+        df.groupby("execucao")
+        .size()
+        .reset_index(name="Quantidade")
+        .sort_values("Quantidade", ascending=False)
+    )
+
+    resumo["Percentual"] = (resumo["Quantidade"] / total * 100).round(1)
+
+    ranking = (
+        df.groupby("Resp_1")
+        .size()
+        .reset_index(name="Quantidade")
+        .sort_values("Quantidade", ascending=False)
+    )
+
+    top_resps = ranking.head(5)
+
+    if "Eixo" in df.columns:
+        eixo = (
+            df.groupby("Eixo")
+            .size()
+            .reset_index(name="Total")
+            .sort_values("Total", ascending=False)
+        )
+    else:
+        eixo = None
+
+    maior = resumo.iloc[0]["execucao"]
+    segundo = resumo.iloc[1]["execucao"]
+
+    texto = f"""
+1. Análise Geral da Execução das Metas
+
+A análise do painel gerencial indica um total de {total} metas institucionais registradas no sistema de acompanhamento.
+
+Observa-se que a maior parte das metas encontra-se nas fases “{maior}” e “{segundo}”, indicando que as ações previstas no planejamento estratégico encontram-se em processo de execução.
+
+De modo geral, o cenário evidencia um nível moderado de execução das metas.
+
+3. Execução por Responsável
+"""
+
+    for _, row in top_resps.iterrows():
+        texto += f"\n{row['Resp_1']} – {row['Quantidade']} metas"
+
+    if eixo is not None:
+
+        texto += "\n\n4. Execução das Metas por Eixo Estratégico\n"
+
+        for _, row in eixo.iterrows():
+            texto += f"\n{row['Eixo']} – {row['Total']} metas"
+
+    return texto
+
+
+
+
+def gerar_relatorio_word_graficos(df):
+
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from datetime import datetime
+
+    document = Document()
+
+    # -------------------
+    # CAPA
+    # -------------------
+
+    document.add_heading("RELATÓRIO GERENCIAL DE METAS", level=0)
+
+    p = document.add_paragraph()
+    p.add_run("Sistema de Acompanhamento de Metas\n").bold = True
+    p.add_run(f"Data de geração: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    document.add_page_break()
+
+    # TEXTO ANALÍTICO AUTOMÁTICO
+    document.add_heading("Análise Gerencial das Metas", level=1)
+
+    #texto = gerar_texto_relatorio(df)
+
+    # garante que sempre apareça
+    #if texto:
+    #    for linha in texto.split("\n"):
+    #        document.add_paragraph(linha)
+    #else:
+    #    document.add_paragraph("Análise automática não disponível.")
+
+    document.add_paragraph("TESTE TEXTO AUTOMÁTICO")
+
+     # --------------------------------------------------------------------------
+     # RESUMO GERAL
+     # ---------------------------------------------------------------------------
+
+    document.add_heading("1. Resumo Geral", level=1)
+
+    resumo = (
+        df.groupby("execucao")
+        .size()
+        .reset_index(name="Quantidade")
+        .sort_values("Quantidade", ascending=False)
+    )
+
+    total = resumo["Quantidade"].sum()
+    resumo["Percentual (%)"] = (resumo["Quantidade"] / total * 100).round(1)
+
+    tabela = document.add_table(rows=1, cols=3)
+    cab = tabela.rows[0].cells
+    cab[0].text = "Situação"
+    cab[1].text = "Quantidade"
+    cab[2].text = "Percentual (%)"
+
+    for _, row in resumo.iterrows():
+        linha = tabela.add_row().cells
+        linha[0].text = str(row["execucao"])
+        linha[1].text = str(row["Quantidade"])
+        linha[2].text = str(row["Percentual (%)"])
+
+    # gráfico geral
+    fig, ax = plt.subplots()
+    ax.bar(resumo["execucao"], resumo["Quantidade"])
+    ax.set_title("Situação Geral das Metas")
+    plt.xticks(rotation=45)
+
+    img_stream = BytesIO()
+    plt.tight_layout()
+    plt.savefig(img_stream, format="png")
+    plt.close(fig)
+
+    document.add_picture(img_stream, width=Inches(5))
+
+    # -------------------
+    # PERCENTUAL POR EIXO
+    # -------------------
+
+    if "Eixo" in df.columns:
+
+        document.add_page_break()
+        document.add_heading("2. Execução por Eixo", level=1)
+
+        resumo_eixo = (
+            df.groupby(["Eixo", "execucao"])
+            .size()
+            .reset_index(name="Quantidade")
+        )
+
+        tabela_eixo_total = (
+            df.groupby("Eixo")
+            .size()
+            .reset_index(name="Total")
+        )
+
+        # gráfico comparativo por eixo
+        fig, ax = plt.subplots()
+
+        eixo_counts = df["Eixo"].value_counts()
+        ax.bar(eixo_counts.index, eixo_counts.values)
+        ax.set_title("Quantidade de Metas por Eixo")
+        plt.xticks(rotation=45)
+
+        img_stream = BytesIO()
+        plt.tight_layout()
+        plt.savefig(img_stream, format="png")
+        plt.close(fig)
+
+        document.add_picture(img_stream, width=Inches(5))
+
+        # tabela de totais
+        tabela = document.add_table(rows=1, cols=2)
+        cab = tabela.rows[0].cells
+        cab[0].text = "Eixo"
+        cab[1].text = "Total de Metas"
+
+        for _, row in tabela_eixo_total.iterrows():
+            linha = tabela.add_row().cells
+            linha[0].text = str(row["Eixo"])
+            linha[1].text = str(row["Total"])
+
+    # -------------------
+    # RANKING RESPONSÁVEIS
+    # -------------------
+
+    if "Resp_1" in df.columns:
+
+        document.add_page_break()
+        document.add_heading("3. Ranking de Responsáveis", level=1)
+
+        ranking = (
+            df.groupby("Resp_1")
+            .size()
+            .reset_index(name="Quantidade")
+            .sort_values("Quantidade", ascending=False)
+        )
+
+        tabela = document.add_table(rows=1, cols=2)
+        cab = tabela.rows[0].cells
+        cab[0].text = "Responsável"
+        cab[1].text = "Total de Metas"
+
+        for _, row in ranking.iterrows():
+            linha = tabela.add_row().cells
+            linha[0].text = str(row["Resp_1"])
+            linha[1].text = str(row["Quantidade"])
+
+        # gráfico ranking
+        fig, ax = plt.subplots()
+        ax.bar(ranking["Resp_1"], ranking["Quantidade"])
+        ax.set_title("Ranking de Responsáveis")
+        plt.xticks(rotation=45)
+
+        img_stream = BytesIO()
+        plt.tight_layout()
+        plt.savefig(img_stream, format="png")
+        plt.close(fig)
+
+        document.add_picture(img_stream, width=Inches(5))
+
+    # -------------------
+    # FINALIZA
+    # -------------------
+
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def gerar_relatorio_word_graficos_modelo(modelo):
+
+    # recebe o modelo colunar de modelo.py (dashboard.py): o DataFrame de
+    # todas as metas só é montado no processo do pool, quando o relatório
+    # é pedido, e não a cada rerun do painel
+    return gerar_relatorio_word_graficos(materializar(modelo))
@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+
+import pytest
+from sqlalchemy import text
+
+# os módulos do projeto ficam na raiz do repositório
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+BANCO = os.path.join(RAIZ, "banco.db")
+
+# testes no Postgres só com PDI_TESTE_POSTGRES apontando para um banco
+# descartável, por exemplo postgresql+psycopg2://postgres@/teste?host=/tmp
+URL_POSTGRES = os.environ.get("PDI_TESTE_POSTGRES")
+
+# medições de tempo só com PDI_TESTE_DESEMPENHO definida: numa máquina
+# carregada elas falham sem que o código tenha mudado
+DESEMPENHO = os.environ.get("PDI_TESTE_DESEMPENHO")
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def engine_vazia(request, tmp_path):
+
+    # banco sem tabelas, em cada dialeto disponível
+    from conexao import criar_engine
+
+    if request.param == "sqlite":
+        engine = criar_engine(f"sqlite:///{tmp_path / 'teste.db'}")
+    elif URL_POSTGRES:
+        engine = criar_engine(URL_POSTGRES)
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+    else:
+        pytest.skip("PDI_TESTE_POSTGRES não definida")
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def banco_copia(tmp_path):
+
+    # cópia do banco.db do repositório: os testes nunca abrem o original
+    # (criar_engine liga o WAL no arquivo)
+    copia = tmp_path / "banco.db"
+    shutil.copy(BANCO, copia)
+    return copia
+
+
+@pytest.fixture
+def engine_banco(banco_copia):
+
+    from conexao import criar_engine
+
+    engine = criar_engine(f"sqlite:///{banco_copia}")
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def desempenho():
+    if not DESEMPENHO:
+        pytest.skip("PDI_TESTE_DESEMPENHO não definida")
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+import streamlit as st
+from sqlalchemy import create_engine, text
+from streamlit.testing.v1 import AppTest
+
+# =====================================================
+# TELAS DOS RESPONSÁVEIS (app.py E app2.py)
+# =====================================================
+# Rodam com o AppTest do Streamlit, já logadas, numa cópia do banco.db.
+# app.py lê a URL de st.secrets; app2.py abre "banco.db" na pasta atual.
+
+PAGINAS = ["app.py", "app2.py"]
+RESPONSAVEL = "PROAD"
+
+
+def _abrir(pagina, banco_copia, monkeypatch):
+
+    # cada teste com a sua cópia: descarta a engine guardada pelo anterior
+    st.cache_resource.clear()
+    monkeypatch.chdir(banco_copia.parent)
+
+    caminho = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), pagina)
+    at = AppTest.from_file(caminho, default_timeout=60)
+    for chave in ["GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "REDIRECT_URI"]:
+        at.secrets[chave] = "teste"
+    at.secrets["DATABASE_URL"] = f"sqlite:///{banco_copia}"
+
+    at.session_state["logado"] = True
+    at.session_state["usuario"] = RESPONSAVEL
+    at.session_state["email"] = "proad@teste"
+    return at.run()
+
+
+def _salvar(at):
+    next(b for b in at.button if b.label == "Salvar alterações").click()
+    return at.run()
+
+
+def _metas(banco_copia):
+    engine = create_engine(f"sqlite:///{banco_copia}")
+    with engine.connect() as conn:
+        metas = conn.execute(text(
+            'SELECT "Ordem", execucao, "Ano_Conclusao", execucao2 FROM metas ORDER BY "Ordem"'
+        )).all()
+    engine.dispose()
+    return metas
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_salvar_sem_mexer_em_nada_nao_grava(pagina, banco_copia, monkeypatch):
+
+    # a maioria das metas do banco.db está com execucao = '' (não preenchida)
+    antes = _metas(banco_copia)
+    at = _salvar(_abrir(pagina, banco_copia, monkeypatch))
+
+    assert not at.exception
+    assert "Nenhuma alteração para salvar." in [i.value for i in at.info]
+    assert _metas(banco_copia) == antes
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_salvar_grava_so_a_meta_alterada(pagina, banco_copia, monkeypatch):
+
+    antes = _metas(banco_copia)
+    at = _abrir(pagina, banco_copia, monkeypatch)
+
+    caixa = at.selectbox[0]
+    caixa.set_value("INICIADA")
+    at = _salvar(at)
+
+    assert not at.exception
+    assert [s.value for s in at.success] == ["Alterações salvas com sucesso! 1 meta(s) atualizada(s)."]
+
+    mudaram = [depois for anterior, depois in zip(antes, _metas(banco_copia)) if anterior != depois]
+    assert len(mudaram) == 1
+    assert mudaram[0].execucao == "INICIADA"
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from classificacao import (
+    anos_seguros,
+    classificar_execucao2,
+    classificar_execucao2_vetorizado,
+    inteiro_seguro,
+    situacoes_exec2
+)
+
+# =====================================================
+# VETORIZADA x LINHA A LINHA
+# =====================================================
+
+SITUACOES = ["NÃO INICIADA", "INICIADA", "EM ANDAMENTO", "AVANÇADA", "CONCLUÍDA", "", None, np.nan]
+
+# o que aparece numa coluna de ano vinda do banco ou da planilha
+ANOS_ESTRANHOS = [
+    None, np.nan, pd.NA, True, False, float("inf"), -0.5, 2024.9,
+    "2024", " 2025 ", "2026.0", "2.024e3", "2024-2025", "abc", "", "1_000", "inf",
+]
+
+
+def _anos_sorteados(sorteio, n):
+    # inteiros, reais, texto numérico e lixo, misturados numa coluna object
+    tipo = sorteio.integers(0, 4, n)
+    anos = sorteio.integers(2018, 2034, n)
+    valores = np.empty(n, dtype=object)
+    valores[tipo == 0] = anos[tipo == 0]
+    valores[tipo == 1] = anos[tipo == 1] + sorteio.random((tipo == 1).sum())
+    valores[tipo == 2] = [str(a) for a in anos[tipo == 2]]
+    estranhos = np.flatnonzero(tipo == 3)
+    valores[estranhos] = [ANOS_ESTRANHOS[i] for i in sorteio.integers(0, len(ANOS_ESTRANHOS), len(estranhos))]
+    return valores
+
+
+def _metas_sorteadas(semente, n):
+    sorteio = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "execucao": [SITUACOES[i] for i in sorteio.integers(0, len(SITUACOES), n)],
+        "Inicio": _anos_sorteados(sorteio, n),
+        "Fim": _anos_sorteados(sorteio, n),
+        "Ano_Conclusao": _anos_sorteados(sorteio, n),
+    })
+
+
+def test_anos_seguros_igual_a_inteiro_seguro():
+    valores = np.array(ANOS_ESTRANHOS + [2024, np.int64(2030), np.float32(2024.5)], dtype=object)
+    esperado = [inteiro_seguro(v) for v in valores]
+    obtido = [None if np.isnan(a) else int(a) for a in anos_seguros(valores)]
+    assert obtido == esperado
+
+
+def test_vetorizada_igual_a_linha_a_linha():
+    for semente in range(5):
+        df = _metas_sorteadas(semente, 20_000)
+        esperado = df.apply(classificar_execucao2, axis=1)
+        obtido = classificar_execucao2_vetorizado(df)
+
+        divergentes = obtido.astype(object) != esperado
+        assert not divergentes.any(), df[divergentes].head()
+
+
+def test_vetorizada_com_colunas_numericas():
+    # o caso comum: anos como vêm do banco (inteiro com nulo, real)
+    sorteio = np.random.default_rng(10)
+    n = 20_000
+    df = pd.DataFrame({
+        "execucao": [SITUACOES[i] for i in sorteio.integers(0, len(SITUACOES), n)],
+        "Inicio": pd.array(np.where(sorteio.random(n) < 0.1, None, sorteio.integers(2018, 2034, n)), dtype="Int64"),
+        "Fim": np.where(sorteio.random(n) < 0.1, np.nan, sorteio.integers(2018, 2034, n).astype(float)),
+        "Ano_Conclusao": pd.array(np.where(sorteio.random(n) < 0.5, None, sorteio.integers(2018, 2034, n)), dtype="Int64"),
+    })
+
+    esperado = df.astype(object).apply(classificar_execucao2, axis=1)
+    assert (classificar_execucao2_vetorizado(df).astype(object) == esperado).all()
+
+
+def test_vetorizada_devolve_categoria_com_as_nove_situacoes():
+    resultado = classificar_execucao2_vetorizado(_metas_sorteadas(0, 100))
+    assert isinstance(resultado.dtype, pd.CategoricalDtype)
+    assert list(resultado.cat.categories) == situacoes_exec2
+
+
+def test_vetorizada_um_milhao_de_metas_em_menos_de_um_segundo(desempenho):
+    sorteio = np.random.default_rng(0)
+    n = 1_000_000
+    df = pd.DataFrame({
+        "execucao": pd.Categorical.from_codes(sorteio.integers(0, 5, n), SITUACOES[:5]),
+        "Inicio": pd.array(sorteio.integers(2018, 2034, n), dtype="Int64"),
+        "Fim": sorteio.integers(2018, 2034, n).astype(float),
+        "Ano_Conclusao": pd.array(np.where(sorteio.random(n) < 0.5, None, sorteio.integers(2018, 2034, n)), dtype="Int64"),
+    })
+
+    classificar_execucao2_vetorizado(df.head(1000))
+    inicio = time.perf_counter()
+    classificar_execucao2_vetorizado(df)
+    assert time.perf_counter() - inicio < 1.0
@@ -0,0 +1,198 @@
+import random
+import sqlite3
+import threading
+import time
+
+import pytest
+from pandas.errors import DatabaseError
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+import conexao
+from banco import (
+    atualizar_situacoes,
+    carregar_metas,
+    criar_view_metas_temporal,
+    garantir_coluna_execucao2,
+    garantir_resumo_metas,
+    garantir_tabela_controle,
+    incrementar_versao_dados,
+    ler_versao_dados
+)
+from migracoes import aplicar_migracoes
+
+
+# =====================================================
+# ENGINE COMPARTILHADA SOB CARGA
+# =====================================================
+# 16 sessões x 10 reruns, cada rerun numa thread nova (como o Streamlit),
+# com as consultas de app.py: criar_engine contra uma conexão nova por
+# consulta (NullPool, como o conectar() que app2.py usava).
+
+SESSOES = 16
+RERUNS = 10
+
+
+def _rerun(engine, erros):
+
+    # o que cada rerun de app.py consulta: e-mail, metas e versão dos dados
+    try:
+        with engine.connect() as conn:
+            conn.execute(
+                text("SELECT usuario FROM responsaveis WHERE LOWER(TRIM(email)) = LOWER(TRIM(:email))"),
+                {"email": " sti@exemplo.gov.br "}
+            ).fetchone()
+        carregar_metas(engine, ["Resp_1", "execucao", "execucao2"])
+        ler_versao_dados(engine)
+    except Exception as erro:
+        erros.append(erro)
+
+
+def _carga(engine):
+
+    # devolve os erros e quantas conexões o banco abriu
+    abertas = []
+    event.listen(engine, "connect", lambda conexao_dbapi, registro: abertas.append(1))
+    erros = []
+
+    def sessao():
+        for _ in range(RERUNS):
+            rerun = threading.Thread(target=_rerun, args=(engine, erros))
+            rerun.start()
+            rerun.join()
+
+    sessoes = [threading.Thread(target=sessao) for _ in range(SESSOES)]
+    for s in sessoes:
+        s.start()
+    for s in sessoes:
+        s.join()
+
+    return erros, len(abertas)
+
+
+def test_engine_compartilhada_sob_carga(banco_copia):
+
+    url = f"sqlite:///{banco_copia}"
+
+    # com o pool do tamanho das sessões simultâneas, as conexões são
+    # reaproveitadas entre as threads (acima de pool_size, as extras são
+    # fechadas na devolução)
+    engine = conexao.criar_engine(url, pool_size=SESSOES, max_overflow=10)
+    with engine.begin() as conn:
+        garantir_tabela_controle(conn)
+        criar_view_metas_temporal(conn)
+
+    erros, abertas = _carga(engine)
+    e = conexao.estatisticas_pool(engine)
+    engine.dispose()
+
+    sem_pool = create_engine(url, poolclass=NullPool)
+    erros_sem_pool, abertas_sem_pool = _carga(sem_pool)
+    sem_pool.dispose()
+
+    assert not erros, erros[:3]
+    assert not erros_sem_pool, erros_sem_pool[:3]
+    assert e["esgotamentos"] == 0
+    assert e["em_uso"] == 0
+
+    # 3 retiradas por rerun: sem pool, cada uma abre uma conexão; com
+    # criar_engine, no máximo uma por sessão
+    retiradas = SESSOES * RERUNS * 3
+    assert e["retiradas"] >= retiradas
+    assert abertas_sem_pool >= retiradas
+    assert abertas <= SESSOES
+
+
+# =====================================================
+# CONCORRÊNCIA NO SQLITE (LEITORES E ESCRITORES)
+# =====================================================
+# Leitores (o que cada visita aos painéis consulta) e escritores (o
+# "Salvar alterações" dos responsáveis) ao mesmo tempo, numa cópia do
+# banco.db: o journal padrão com uma conexão por consulta contra
+# criar_engine (WAL e PRAGMAs de conexao.py).
+
+def _preparar(engine):
+
+    # o que as páginas preparam ao abrir (view, controle, resumo_metas,
+    # execucao2 e índices), sem os atalhos por processo de banco.py:
+    # cada cópia testada começa do zero
+    with engine.begin() as conn:
+        garantir_tabela_controle(conn)
+        garantir_coluna_execucao2(conn)
+        garantir_resumo_metas(conn)
+        if "metas_temporal" not in inspect(conn).get_view_names():
+            criar_view_metas_temporal(conn)
+    aplicar_migracoes(engine)
+
+
+def _testar_concorrencia(engine, leitores=4, escritores=2, segundos=1):
+
+    _preparar(engine)
+
+    with engine.connect() as conn:
+        ids = [linha[0] for linha in conn.execute(text("SELECT rowid FROM metas"))]
+
+    resultado = {"leituras": 0, "gravacoes": 0, "erros": []}
+    lock = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def contar(tipo, erro=None):
+        with lock:
+            if erro is None:
+                resultado[tipo] += 1
+            else:
+                resultado["erros"].append(str(getattr(erro, "orig", erro)))
+
+    def ler():
+        while time.perf_counter() < fim:
+            try:
+                ler_versao_dados(engine)
+                carregar_metas(engine, ["Resp_1", "execucao", "execucao2"])
+                contar("leituras")
+            except (OperationalError, DatabaseError) as erro:
+                # pandas.read_sql embrulha o erro do banco em DatabaseError
+                contar("leituras", erro)
+
+    def gravar(semente):
+        sorteio = random.Random(semente)
+        while time.perf_counter() < fim:
+            alteracoes = [
+                (id_meta, sorteio.choice(["INICIADA", "EM ANDAMENTO", "AVANÇADA"]), "")
+                for id_meta in sorteio.sample(ids, min(5, len(ids)))
+            ]
+            try:
+                with engine.begin() as conn:
+                    atualizar_situacoes(conn, alteracoes, chave="rowid")
+                    incrementar_versao_dados(conn)
+                contar("gravacoes")
+            except OperationalError as erro:
+                contar("gravacoes", erro)
+
+    threads = [threading.Thread(target=ler) for _ in range(leitores)]
+    threads += [threading.Thread(target=gravar, args=(i,)) for i in range(escritores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return resultado
+
+
+@pytest.mark.parametrize("wal", [False, True], ids=["journal_padrao", "criar_engine"])
+def test_concorrencia_le_e_grava(banco_copia, wal):
+
+    # a cópia herda o journal_mode do original: começa do padrão
+    with sqlite3.connect(banco_copia) as conn:
+        conn.execute("PRAGMA journal_mode = DELETE")
+
+    url = f"sqlite:///{banco_copia}"
+    engine = conexao.criar_engine(url) if wal else create_engine(url, poolclass=NullPool)
+    r = _testar_concorrencia(engine)
+    engine.dispose()
+
+    assert r["leituras"] > 0
+    assert r["gravacoes"] > 0
+    # com WAL, leitores e escritores não se bloqueiam ("database is locked")
+    if wal:
+        assert not r["erros"], r["erros"][:3]
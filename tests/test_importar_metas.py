@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import inspect, text
+
+import banco
+from banco import atualizar_situacoes, ler_versao_dados, recalcular_execucao2_virada_de_ano
+from importar_metas import importar_em_lote, importar_incremental, importar_substituindo, ler_planilha
+from migracoes import aplicar_migracoes, versao_esquema
+
+
+def _salvar_uma_meta(engine):
+
+    # o que app.py faz ao salvar: execucao, Ano_Conclusao e execucao2
+    with engine.begin() as conn:
+        ordem = conn.execute(text('SELECT MIN("Ordem") FROM metas')).scalar()
+        atualizar_situacoes(conn, [(ordem, "CONCLUÍDA", "2024")])
+        return conn.execute(
+            text('SELECT execucao2 FROM metas WHERE "Ordem" = :ordem'), {"ordem": ordem}
+        ).scalar()
+
+
+def test_substituir_mantem_execucao2(engine_banco, monkeypatch):
+
+    # virada de ano já registrada em controle antes da importação
+    monkeypatch.setattr(banco, "_ano_verificado", None)
+    recalcular_execucao2_virada_de_ano(engine_banco)
+
+    df, _ = ler_planilha()
+    importar_substituindo(engine_banco, df)
+
+    colunas = [c["name"] for c in inspect(engine_banco).get_columns("metas")]
+    assert "execucao2" in colunas
+
+    with engine_banco.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM metas WHERE execucao2 IS NULL")).scalar() == 0
+
+    assert _salvar_uma_meta(engine_banco) is not None
+
+
+def test_virada_de_ano_recria_execucao2_mesmo_no_ano_registrado(engine_banco, monkeypatch):
+
+    monkeypatch.setattr(banco, "_ano_verificado", None)
+    recalcular_execucao2_virada_de_ano(engine_banco)
+
+    # tabela recriada sem a coluna (como o --substituir antigo)
+    with engine_banco.begin() as conn:
+        conn.execute(text("ALTER TABLE metas DROP COLUMN execucao2"))
+
+    monkeypatch.setattr(banco, "_ano_verificado", None)
+    assert recalcular_execucao2_virada_de_ano(engine_banco) > 0
+    assert _salvar_uma_meta(engine_banco) is not None
+
+
+def test_importar_em_banco_novo(engine_vazia):
+
+    # banco sem nenhuma tabela (nem responsaveis): as migrações que
+    # dependem de outras tabelas ficam para depois
+    df, _ = ler_planilha()
+    resumo = importar_em_lote(engine_vazia, df)
+
+    assert resumo["inseridas"] == len(df)
+    assert versao_esquema(engine_vazia) == 2
+
+    # com a tabela criada, a migração 3 roda na próxima aplicação comum
+    with engine_vazia.begin() as conn:
+        conn.execute(text("CREATE TABLE responsaveis (usuario TEXT, email TEXT)"))
+
+    assert [versao for versao, _ in aplicar_migracoes(engine_vazia)] == [3]
+    assert versao_esquema(engine_vazia) == 3
+    # (o inspect do SQLAlchemy não lista índices de expressão no SQLite)
+    catalogo = (
+        "SELECT name FROM sqlite_master WHERE type = 'index'"
+        if engine_vazia.dialect.name == "sqlite" else
+        "SELECT indexname FROM pg_indexes"
+    )
+    with engine_vazia.connect() as conn:
+        assert "ix_responsaveis_email" in conn.execute(text(catalogo)).scalars().all()
+
+    with engine_vazia.begin() as conn:
+        conn.execute(text("DROP TABLE metas CASCADE" if engine_vazia.dialect.name == "postgresql" else "DROP TABLE metas"))
+
+    assert importar_substituindo(engine_vazia, df)["inseridas"] == len(df)
+
+
+@pytest.mark.parametrize("importar", [importar_incremental, importar_em_lote])
+def test_reimportar_a_mesma_planilha_nao_altera_nada(engine_vazia, importar):
+
+    # banco com o que a importação antiga gravava: '' no lugar de nulo e
+    # texto com tabulação no fim (ler_planilha tira os dois)
+    df, _ = ler_planilha()
+    importar_substituindo(engine_vazia, df)
+
+    with engine_vazia.begin() as conn:
+        conn.execute(text('UPDATE metas SET "Resp_7" = \'\' WHERE "Resp_7" IS NULL'))
+        conn.execute(text('UPDATE metas SET "Meta" = "Meta" || :tab'), {"tab": "\t"})
+
+    versao = ler_versao_dados(engine_vazia)
+    resumo = importar(engine_vazia, df)
+
+    assert (resumo["atualizadas"], resumo["inalteradas"]) == (0, len(df))
+    assert ler_versao_dados(engine_vazia) == versao
+
+    # uma mudança de verdade continua sendo gravada
+    df.loc[0, "Resp_7"] = "STI"
+    assert importar(engine_vazia, df)["atualizadas"] == 1
+
+
+def _colunas_view(engine):
+    with engine.connect() as conn:
+        return list(conn.execute(text("SELECT * FROM metas_temporal")).keys())
+
+
+@pytest.mark.parametrize("importar", [importar_incremental, importar_em_lote])
+def test_view_acompanha_as_colunas_da_planilha(engine_vazia, importar):
+
+    df, _ = ler_planilha()
+    importar_substituindo(engine_vazia, df)
+
+    # coluna nova na planilha aparece na view
+    importar(engine_vazia, df.assign(Observacao="nova"))
+    assert "Observacao" in _colunas_view(engine_vazia)
+
+    # --substituir sem uma coluna: a view não aponta mais para ela
+    importar_substituindo(engine_vazia, df.drop(columns="Resp_7"))
+    colunas = _colunas_view(engine_vazia)
+    assert "Resp_7" not in colunas and "Observacao" not in colunas
+    assert "execucao2" in colunas
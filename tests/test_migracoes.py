@@ -0,0 +1,23 @@
+import pandas as pd
+from sqlalchemy import text
+
+from migracoes import aplicar_migracoes, verificar_indices, versao_esquema
+
+
+def test_consultas_usam_os_indices(engine_vazia, engine_banco):
+
+    # metas e responsaveis do banco.db; no Postgres, copiados para o banco
+    # de teste
+    engine = engine_banco
+    if engine_vazia.dialect.name != "sqlite":
+        with engine_banco.connect() as conn:
+            for tabela in ["metas", "responsaveis"]:
+                pd.read_sql(text(f"SELECT * FROM {tabela}"), conn).to_sql(tabela, engine_vazia, index=False)
+        engine = engine_vazia
+
+    aplicar_migracoes(engine)
+    assert versao_esquema(engine) == 3
+
+    # cada consulta de app.py usa o seu índice, sem ordenação à parte
+    falhas = [item for item in verificar_indices(engine) if not item["ok"]]
+    assert not falhas, [(f["consulta"], f["indice"], f["plano"]) for f in falhas]
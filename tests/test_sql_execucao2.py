@@ -0,0 +1,150 @@
+import random
+
+import pandas as pd
+from sqlalchemy import text
+
+from banco import criar_view_metas_temporal
+from classificacao import _sql_inteiro, classificar_execucao2, inteiro_seguro, sql_execucao2
+from conexao import criar_engine
+
+# =====================================================
+# SQL (view metas_temporal) x PYTHON (classificar_execucao2)
+# =====================================================
+# A view, os gatilhos do resumo_metas e o merge de importar_metas usam
+# sql_execucao2; app.py/app2.py gravam execucao2 com classificar_execucao2.
+# As duas precisam dar a mesma classificação para os mesmos valores.
+
+SITUACOES = ["NÃO INICIADA", "INICIADA", "EM ANDAMENTO", "AVANÇADA", "CONCLUÍDA", "", None]
+
+# anos como chegam da planilha e das telas: número, texto, lixo
+BORDAS = [
+    None, 2020, 2023, 2024, 2026, 2030, 2024.0, 2024.9, -2024, 0, 0.5,
+    "2024", " 2024 ", "\t2026\n", "2024.0", "2024.9", "+2024", "-2024", "2.024e3", "2024e0",
+    "1e3", "1E3", "1e+3", "1e-3", ".5", "5.", "2024.", "-0.5", "00", "0",
+    "2024-2025", "2027-", "1.2.3", "1..2", "++1", "+-1", "--1", "2024a", "a2024", "20 24",
+    "1e", "e3", "1e3.5", "1_000", "2024,5", "0x10", "inf", "-inf", "nan", "NaN", "infinity",
+    "1e400", "-1e400", "", "  ", ".", "+", "-", "\xa02024", "٢٠٢٤", "CONCLUÍDA",
+]
+
+
+def _iguais(a, b):
+    # acima de 2**53 o float não guarda o inteiro exato (e o SQLite
+    # satura em 64 bits): qualquer valor dessa ordem serve como igual
+    if a is None or b is None:
+        return a is None and b is None
+    return int(a) == int(b) or (abs(a) >= 2**53 and abs(b) >= 2**53)
+
+
+def _gravar(engine, linhas):
+
+    # colunas sem tipo no SQLite (o valor fica como veio: texto, inteiro
+    # ou real) e TEXT no Postgres
+    tipo = "" if engine.dialect.name == "sqlite" else "TEXT"
+    colunas = ", ".join(f'"{c}" {tipo}' for c in ["execucao", "Inicio", "Fim", "Ano_Conclusao"])
+
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE metas (id INTEGER, {colunas})"))
+
+        if engine.dialect.name != "sqlite":
+            linhas = [[v if v is None else str(v) for v in linha] for linha in linhas]
+
+        conn.execute(
+            text('INSERT INTO metas VALUES (:id, :execucao, :inicio, :fim, :ano)'),
+            [
+                {"id": i, "execucao": e, "inicio": a, "fim": b, "ano": c}
+                for i, (e, a, b, c) in enumerate(linhas)
+            ]
+        )
+
+
+def _comparar(engine):
+
+    # classificação do banco e do Python sobre os valores lidos do banco
+    with engine.connect() as conn:
+        linhas = conn.execute(text(f"""
+            SELECT execucao, "Inicio", "Fim", "Ano_Conclusao",
+                   {sql_execucao2(engine.dialect.name)} AS execucao2
+            FROM metas
+        """)).all()
+
+    divergentes = [
+        (linha, classificar_execucao2(linha._mapping))
+        for linha in linhas
+        if classificar_execucao2(linha._mapping) != linha.execucao2
+    ]
+    return len(linhas), divergentes
+
+
+def test_ano_sql_igual_a_inteiro_seguro(engine_vazia):
+
+    # BORDAS e textos sorteados com os caracteres de um número
+    sorteio = random.Random(0)
+    valores = BORDAS + [
+        "".join(sorteio.choice("0123456789.eE+- \t") for _ in range(sorteio.randint(1, 7)))
+        for _ in range(5000)
+    ]
+    _gravar(engine_vazia, [["", v, None, None] for v in valores])
+
+    ano = _sql_inteiro('"Inicio"', engine_vazia.dialect.name)
+    with engine_vazia.connect() as conn:
+        lidos = conn.execute(text(f'SELECT "Inicio", {ano} FROM metas ORDER BY id')).all()
+
+    divergentes = [
+        (valor, inteiro_seguro(valor), sql)
+        for valor, sql in lidos
+        if not _iguais(inteiro_seguro(valor), sql)
+    ]
+    assert not divergentes, divergentes[:10]
+
+
+def test_classificacao_sql_igual_a_python_nas_bordas(engine_vazia):
+
+    # cada valor de BORDAS em cada coluna de ano, mais combinações sorteadas
+    sorteio = random.Random(1)
+    comuns = [None, 2023, 2026, 2030]
+    linhas = []
+
+    for situacao in SITUACOES:
+        for valor in BORDAS:
+            for outro in comuns:
+                linhas.append([situacao, valor, outro, outro])
+                linhas.append([situacao, outro, valor, outro])
+                linhas.append([situacao, 2024, 2027, valor])
+
+    linhas += [
+        [sorteio.choice(SITUACOES)] + [sorteio.choice(BORDAS) for _ in range(3)]
+        for _ in range(5000)
+    ]
+    _gravar(engine_vazia, linhas)
+
+    total, divergentes = _comparar(engine_vazia)
+    assert total == len(linhas)
+    assert not divergentes, divergentes[:10]
+
+
+def test_view_igual_a_python_no_banco_distribuido(engine_vazia, banco_copia):
+
+    # metas do banco.db do repositório (Ano_Conclusao mistura inteiro e
+    # texto), numa cópia: criar_engine liga o WAL no arquivo
+    engine = criar_engine(f"sqlite:///{banco_copia}")
+
+    if engine_vazia.dialect.name != "sqlite":
+        with engine.connect() as conn:
+            metas = pd.read_sql(text("SELECT * FROM metas"), conn)
+        engine.dispose()
+        engine = engine_vazia
+        metas.to_sql("metas", engine, index=False)
+
+    with engine.begin() as conn:
+        criar_view_metas_temporal(conn)
+
+    with engine.connect() as conn:
+        metas = pd.read_sql(text("""
+            SELECT m.execucao, m."Inicio", m."Fim", m."Ano_Conclusao", t.execucao2
+            FROM metas m JOIN metas_temporal t ON t."Ordem" = m."Ordem"
+        """), conn)
+
+    assert len(metas) > 0
+    python = metas.apply(classificar_execucao2, axis=1)
+    assert (python == metas["execucao2"]).all(), metas[python != metas["execucao2"]].head()
+